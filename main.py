@@ -1,30 +1,35 @@
 import os
-import sys
 import argparse
-import time
+import atexit
+import threading
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import logging
 import pandas as pd 
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
-# 로깅 설정 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Add modules directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
-
 # [수정된 임포트]: data_processor에서 create_detailed_sheet를 제거
-from modules.web_setup import setup_driver, login_groupware
+from modules.web_setup import setup_driver, login_groupware, restore_session, save_session, WAIT_POLL_FREQUENCY, MAIN_PAGE_READY_XPATH
 from modules.data_crawler import get_last_12_months, parse_date_range, crawl_all_data, navigate_to_handover_document_list 
 from modules.data_processor import export_to_excel, process_monthly_summary, create_profit_analysis
 
-def main():
-    """Main execution function"""
-    # Load environment variables
-    load_dotenv()
-    
-    # Parse command line arguments
+def quit_driver_in_background(driver, timeout: float = 10) -> threading.Thread:
+    """
+    driver.quit()을 데몬 스레드에서 실행하여 종료 대기로 스크립트가 멈추지 않게 합니다.
+    인터프리터 종료 시 최대 timeout초까지만 정리를 기다립니다.
+    """
+    quit_thread = threading.Thread(target=driver.quit, name="webdriver-quit", daemon=True)
+    quit_thread.start()
+    atexit.register(quit_thread.join, timeout)
+    return quit_thread
+
+def build_parser() -> argparse.ArgumentParser:
+    """명령행 인수 파서를 생성합니다. (기본값은 환경변수에서 읽음)"""
     parser = argparse.ArgumentParser(description='영업 부서 매출/매입 현황 자동화 시스템')
     
     parser.add_argument('--url', help='그룹웨어 URL', default=os.getenv('GROUPWARE_URL'))
@@ -38,9 +43,20 @@ def main():
     
     parser.add_argument('--headless', action='store_true', default=True, help='브라우저 창을 숨김 (Headless 모드 실행)')
     parser.add_argument('--no-headless', action='store_true', help='브라우저 창을 표시 (디버깅용)')
+    parser.add_argument('--no-session-cache', action='store_true', help='저장된 로그인 세션을 사용하지 않음')
+    parser.add_argument('--workers', type=int, default=1, help='팝업 상세 추출에 사용할 브라우저 세션 수 (기본값: 1)')
+    parser.add_argument('--grid-url', help='Selenium Grid 허브 URL (지정 시 모든 브라우저 세션을 Grid 노드에서 실행)', default=os.getenv('SELENIUM_GRID_URL'))
+    parser.add_argument('--raw-output', help='추출한 원본 문서 데이터를 JSONL로 기록할 경로 (예: output/raw_data.jsonl)')
     
-    args = parser.parse_args()
+    return parser
+
+def run_pipeline(args) -> int:
+    """
+    로그인 → 목록 이동 → 크롤링 → 분석 → Excel 생성 전체 파이프라인을 실행합니다.
     
+    Returns:
+        int: 종료 코드 (0: 성공, 1: 실패)
+    """
     # Validate arguments
     if not all([args.url, args.id, args.pw]):
         print("❌ 오류: 그룹웨어 URL, ID, 비밀번호가 필요합니다.")
@@ -50,16 +66,16 @@ def main():
     # Determine date range
     if args.mode == 'auto':
         start_date, end_date = get_last_12_months()
-        logger.info(f"📅 지정된 기간간 데이터 추출")
+        logger.info("📅 지정된 기간간 데이터 추출")
     else:
         if not args.start_date or not args.end_date:
             logger.error("❌ 오류: manual 모드에서는 --start-date와 --end-date가 필요합니다.")
             return 1
         try:
             start_date, end_date = parse_date_range(args.start_date, args.end_date)
-            logger.info(f"📅 수동 모드: 지정된 기간 데이터 추출")
+            logger.info("📅 수동 모드: 지정된 기간 데이터 추출")
         except ValueError as e:
-            logger.error(f"❌ 날짜 형식 오류: {e}")
+            logger.error("❌ 날짜 형식 오류: %s", e)
             return 1
     
     driver = None
@@ -68,16 +84,28 @@ def main():
         
         # Setup WebDriver (디버깅 시 --no-headless 옵션 사용)
         headless_mode = args.headless and not args.no_headless
-        driver = setup_driver(headless=headless_mode)
+        driver = setup_driver(headless=headless_mode, remote_url=args.grid_url)
         
-        # Login to groupware
-        if not login_groupware(driver, args.url, args.id, args.pw):
-            logger.error("❌ 로그인 실패")
-            return 1
-        logger.info("✅ 로그인 성공")
-        
-        # [로그인 확인을 위한 대기]
-        time.sleep(2) 
+        # Login to groupware (저장된 세션이 유효하면 로그인 생략)
+        use_session_cache = not args.no_session_cache
+        if use_session_cache and restore_session(driver, args.url):
+            logger.info("✅ 저장된 세션으로 로그인 생략")
+        else:
+            if not login_groupware(driver, args.url, args.id, args.pw):
+                logger.error("❌ 로그인 실패")
+                return 1
+            logger.info("✅ 로그인 성공")
+            
+            # [로그인 확인을 위한 대기] 고정 대기 대신 메인 화면의 '전자결재' 메뉴가 나타나는 즉시 진행
+            try:
+                WebDriverWait(driver, 10, poll_frequency=WAIT_POLL_FREQUENCY).until(
+                    EC.presence_of_element_located((By.XPATH, MAIN_PAGE_READY_XPATH))
+                )
+            except TimeoutException:
+                logger.warning("⚠️ 로그인 후 메인 화면 로딩 확인 타임아웃. 계속 진행합니다.")
+            
+            if use_session_cache:
+                save_session(driver)
         
         # 메뉴 이동
         logger.info("▶️ 품의서 목록 페이지로 이동 중...")
@@ -86,15 +114,35 @@ def main():
             return 1
         logger.info("✅ 인수인계문서 목록 페이지로 이동 성공.")
         
+        # 병렬 팝업 처리용 추가 브라우저 세션 생성 함수 (로그인 + 목록 페이지 이동까지 수행)
+        def make_worker_driver():
+            worker = setup_driver(headless=headless_mode, remote_url=args.grid_url)
+            try:
+                # 작업용 세션의 복원 실패로 메인 드라이버가 저장한 세션 캐시를 삭제하지 않음
+                logged_in = (use_session_cache and restore_session(worker, args.url, invalidate_on_failure=False)) or \
+                    login_groupware(worker, args.url, args.id, args.pw)
+                if logged_in and navigate_to_handover_document_list(worker):
+                    return worker
+            except Exception as e:
+                # 예상치 못한 오류로 준비에 실패해도 세션(Chrome/Grid 노드)을 남기지 않음
+                logger.error("❌ 추가 브라우저 세션 준비 중 오류 발생: %s", e, exc_info=True)
+            worker.quit()
+            return None
+        
         # 데이터 크롤링 및 표준화된 DataFrame 반환
         logger.info("📊 전체 데이터 크롤링 및 표준화 시작...")
-        df = crawl_all_data(driver, start_date, end_date) 
+        df = crawl_all_data(driver, start_date, end_date, driver_factory=make_worker_driver, workers=args.workers, raw_output=args.raw_output) 
+        
+        # 크롤링 이후 브라우저는 불필요하므로 WebDriver 종료를 분석/Excel 생성과 병행
+        logger.info("🔚 WebDriver 종료 중 (백그라운드)...")
+        quit_driver_in_background(driver)
+        driver = None
         
         if df.empty:
             logger.warning("⚠️ 추출된 데이터가 없거나 날짜 표준화에 실패하여 빈 DataFrame이 반환되었습니다.")
             return 0
             
-        logger.info(f"✅ 총 {len(df)}건의 표준화된 데이터 추출 완료")
+        logger.info("✅ 총 %d건의 표준화된 데이터 추출 완료", len(df))
         
         # --- 📈 데이터 분석 및 Excel 보고서 생성 ---
         logger.info("📈 데이터 분석 및 Excel 보고서 생성 중...")
@@ -112,17 +160,39 @@ def main():
             analysis_df=analysis_df
         ) 
         
-        logger.info(f"🎉 작업 완료! 보고서가 저장되었습니다: {filename}")
+        logger.info("🎉 작업 완료! 보고서가 저장되었습니다: %s", filename)
         return 0
             
     except Exception as e:
-        logger.error(f"❌ 치명적인 오류 발생: {e}", exc_info=True)
+        logger.error("❌ 치명적인 오류 발생: %s", e, exc_info=True)
         return 1
             
     finally:
         if driver:
-            logger.info("🔚 WebDriver 종료 중...")
-            driver.quit()
+            logger.info("🔚 WebDriver 종료 중 (백그라운드)...")
+            quit_driver_in_background(driver)
+
+def setup_logging():
+    """
+    진입점에서 한 번만 로깅을 설정합니다.
+    (모듈 import 시점에 등록된 핸들러가 있어도 force=True로 교체)
+    """
+    # 레코드마다 스레드/프로세스 정보를 수집하지 않음 (포맷에서 사용하지 않음)
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+
+def main():
+    """Main execution function"""
+    setup_logging()
+    
+    # Load environment variables
+    load_dotenv()
+    
+    # Parse command line arguments
+    args = build_parser().parse_args()
+    return run_pipeline(args)
 
 if __name__ == "__main__":
     exit(main())
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+영업 부서 매출/매입 현황 자동화 시스템 모듈 패키지
+"""
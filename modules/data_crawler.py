@@ -1,33 +1,69 @@
 """
 데이터 크롤링 모듈
 Amaranth 그룹웨어에서 종결된 매출/매입 품의서 데이터를 추출합니다.
+(이 모듈의 모든 대기는 WebDriverWait 기반 명시적 대기이며 implicit wait는 사용하지 않습니다)
 """
 
-import time
+import os
 import re
-from datetime import datetime, timedelta
-from typing import List, Tuple, Dict, Any
+import json
+import threading
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from typing import List, Tuple, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
+import lxml.html
+from lxml import etree
 from selenium.webdriver import ActionChains
 import logging
 
+from modules.web_setup import WAIT_POLL_FREQUENCY
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 환경에서는 표준 json 사용
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 정규식 패턴 (모듈 로드 시 1회 컴파일하여 행/셀 단위 반복 호출에서 재사용)
+_RE_WHITESPACE = re.compile(r'\s+')
+_RE_PAREN_SUFFIX = re.compile(r'\s*\(.+\)')
+# 날짜 형식 3종을 하나의 정규식으로 통합하여 텍스트를 한 번만 스캔 (마지막 그룹 이름으로 형식 구분)
+_RE_DATE = re.compile(
+    r'(?P<y1>\d{4})[./-](?P<m1>\d{1,2})[./-](?P<ymd>\d{1,2})'  # YYYY-MM-DD, YYYY.MM.DD, YYYY/MM/DD
+    r'|(?P<m2>\d{1,2})[.-](?P<d2>\d{1,2})[.-](?P<mdy>\d{4})'  # MM-DD-YYYY, MM.DD.YYYY
+    r'|(?P<m3>\d{1,2})[.-]\s*(?P<md>\d{1,2})'                # MM-DD (목록 페이지 형식)
+)
+
+class _KeepDigitsTable(dict):
+    """
+    str.translate용 변환 테이블: 숫자는 유지하고 그 외 문자(쉼표, '원', 공백 등)는 삭제합니다.
+    처음 보는 문자만 1회 판정한 뒤 캐싱하므로 이후에는 C 레벨 조회만 수행합니다.
+    """
+    def __missing__(self, codepoint: int):
+        value = codepoint if chr(codepoint).isdecimal() else None
+        self[codepoint] = value
+        return value
+
+_KEEP_DIGITS = _KeepDigitsTable()
+
+@lru_cache(maxsize=4096)
 def _clean_amount(text: str) -> int:
     """
     금액 문자열을 정수로 변환합니다.
-    (쉼표 제거 및 숫자만 추출)
+    (쉼표 제거 및 숫자만 추출, '0'/빈 값 등 반복되는 셀 문자열은 캐시에서 바로 반환)
     """
     if not text:
         return 0
     
-    # 숫자(0-9)와 쉼표(,)를 제외한 모든 문자를 제거하고 쉼표를 제거
-    cleaned = re.sub(r'[^\d,]', '', text).replace(',', '')
+    # 숫자를 제외한 모든 문자를 한 번의 translate로 제거 (쉼표 포함)
+    cleaned = text.translate(_KEEP_DIGITS)
     
     try:
         return int(cleaned)
@@ -35,13 +71,163 @@ def _clean_amount(text: str) -> int:
         # 변환 실패 시 0 반환 (데이터 오류 방지)
         return 0
 
-def _clean_text(text: str) -> str:
-    """ 텍스트에서 공백, 줄바꿈, 특수 공백을 제거하고 모두 소문자로 변환합니다. """
-    if not text:
-        return ""
-    # 모든 종류의 공백 문자(줄바꿈, 탭, 일반 공백, nbsp 등) 제거
-    cleaned = re.sub(r'\s+', '', text.strip()).lower()
-    return cleaned
+# 목록 페이지는 전체 page_source 대신 품의서 목록(ul.tableBody) 영역의 HTML만 전송
+JS_LIST_HTML = "var ul = document.querySelector('ul.tableBody'); return ul ? ul.outerHTML : null;"
+# 팝업 전체 page_source 대신 최상위 table들의 HTML만 브라우저에서 잘라 전송
+JS_DETAIL_TABLES_HTML = (
+    "return Array.from(document.querySelectorAll('table:not(table table)'), t => t.outerHTML).join('');"
+)
+# 상세 추출기가 읽는 레이블 셀('발행금액'/'합계'/'공급가액')이 최상위 table 안에 렌더링되었는지 확인
+# (팝업 내용은 클라이언트 스크립트가 그리므로 readyState가 complete여도 table이 아직 없을 수 있음)
+JS_DETAIL_CONTENT_READY = (
+    "return Array.from(document.querySelectorAll('table:not(table table) td, table:not(table table) th'))"
+    ".some(c => /발행금액|합계|공급가액/.test(c.textContent.replace(/\\s+/g, '')));"
+)
+
+def _xp_class(name: str) -> str:
+    """ CSS '.name' 클래스 선택자와 동일한 XPath 조건식을 반환합니다. """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _xpath_literal(text: str) -> str:
+    """ 따옴표가 포함된 문자열도 안전하게 비교할 수 있도록 XPath 문자열 리터럴로 변환합니다. """
+    if '"' not in text:
+        return f'"{text}"'
+    if "'" not in text:
+        return f"'{text}'"
+    parts = text.split('"')
+    return "concat(" + ", '\"', ".join(f'"{part}"' for part in parts) + ")"
+
+# 목록 HTML 스트리밍 파싱 시 한 번에 넘기는 문자 수
+LIST_PARSE_CHUNK_SIZE = 64 * 1024
+# 목록 행 필드별 XPath (lxml 컴파일 객체로 행마다 재사용, 필드마다 따로 평가하여 클래스가 겹쳐도 서로 섞이지 않음)
+XP_ROW_TITLE_SPAN = etree.XPath(f".//*[{_xp_class('titDiv')}]//*[{_xp_class('title')}]//span")
+XP_ROW_TITLE = etree.XPath(f".//*[{_xp_class('titDiv')}]//*[{_xp_class('title')}]")
+XP_ROW_INFO_LINKS = etree.XPath(
+    f"(.//*[{_xp_class('infoDiv')}]//*[{_xp_class('h-box')}])[1]//div[{_xp_class('txt')} and {_xp_class('infoLink')}]"
+)
+XP_ROW_DATE = etree.XPath(f".//*[{_xp_class('dateText')}]")
+XP_ROW_STATUS = etree.XPath(f".//*[{_xp_class('process')}]//*[{_xp_class('ellipsis2')}]")
+
+# 상세 팝업 XPath
+XP_DETAIL_CELLS = etree.XPath(".//td | .//th")
+XP_PURCHASE_SUM_CELLS = etree.XPath(
+    "//*[self::td or self::th][contains(@style, '255, 241, 214') or contains(@style, 'FFF1D6')]"
+)
+XP_ISSUE_AMOUNT_ROW = etree.XPath("(//tr[contains(., '발행금액')])[1]")
+# '합' 뒤에 '계'가 나오는 행만 후보로 수집 (공백을 제거한 텍스트에 '합계'가 있는 행은 모두 포함됨)
+# 최종 판정은 _RE_WHITESPACE로 하여 XPath가 지우지 못하는 공백 문자(U+3000 등)도 동일하게 처리
+XP_TOTAL_ROW_CANDIDATES = etree.XPath("//tr[contains(substring-after(., '합'), '계')]")
+# 매출품의(일반) 금액 레이블 (셀 하나는 이 순서로 처음 일치하는 레이블 하나에만 대응)
+SALES_AMOUNT_LABELS = ('공급가액', '부가세', '합계금액')
+# 레이블의 첫 글자 뒤에 마지막 글자가 나오는 셀만 후보로 수집 (공백을 제거하면 레이블을 포함하는 셀은 모두 포함됨)
+XP_LABEL_CANDIDATE_CELLS = etree.XPath(
+    ".//*[self::td or self::th]["
+    + " or ".join(f"contains(substring-after(., '{label[0]}'), '{label[-1]}')" for label in SALES_AMOUNT_LABELS)
+    + "]"
+)
+XP_NEXT_CELL = etree.XPath("following-sibling::*[self::td or self::th][1]")
+
+def _node_text(element) -> str:
+    """ 요소의 텍스트 조각을 각각 strip하여 이어 붙입니다. (BeautifulSoup의 get_text(strip=True)와 동일) """
+    return ''.join(t.strip() for t in element.itertext())
+
+def _iter_list_rows(html: str):
+    """
+    목록 HTML을 스트리밍 파싱하여 첫 번째 ul.tableBody의 li 행을 닫히는 즉시 하나씩 반환합니다.
+    처리가 끝난 행은 트리에서 제거하므로 전체 목록 트리를 메모리에 유지하지 않습니다.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag='li')
+    parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())  # text_content() 등 lxml.html API 사용
+    container = None
+    
+    for offset in range(0, len(html) + 1, LIST_PARSE_CHUNK_SIZE):
+        chunk = html[offset:offset + LIST_PARSE_CHUNK_SIZE]
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+        
+        for _, row in parser.read_events():
+            parent = row.getparent()
+            if parent is None or parent.tag != 'ul' or 'tableBody' not in (parent.get('class') or '').split():
+                continue
+            if container is None:
+                container = parent
+            elif parent is not container:
+                continue  # 첫 번째 목록 컨테이너의 행만 사용
+            
+            yield row
+            
+            # 처리 완료된 행과 앞선 형제 행 해제
+            row.clear()
+            while row.getprevious() is not None:
+                del parent[0]
+
+def _extract_row_fields(row) -> Optional[Tuple[str, str, str, str]]:
+    """
+    목록 행(li)에서 (제목, 문서번호, 기안일 텍스트, 상태)를 추출합니다.
+    
+    Returns:
+        Optional[Tuple[str, str, str, str]]: 필수 요소가 없으면 None
+    """
+    # 제목은 .title 내부 span 우선, 없으면 .title 전체 텍스트
+    title_elements = XP_ROW_TITLE_SPAN(row) or XP_ROW_TITLE(row)
+    if not title_elements:
+        return None
+    
+    info_links = XP_ROW_INFO_LINKS(row)
+    if len(info_links) < 2:
+        return None
+    
+    date_elements = XP_ROW_DATE(row)
+    status_elements = XP_ROW_STATUS(row)
+    if not date_elements or not status_elements:
+        return None
+    
+    return _node_text(title_elements[0]), _node_text(info_links[1]), _node_text(date_elements[0]), _node_text(status_elements[0])
+
+def _fast_wait(driver, timeout: float = 10) -> WebDriverWait:
+    """
+    짧은 폴링 간격으로 설정된 WebDriverWait를 반환합니다.
+    (폴링 도중 요소가 아직 없거나 DOM 갱신으로 stale 상태가 되는 경우는 재시도)
+    """
+    return WebDriverWait(
+        driver,
+        timeout,
+        poll_frequency=WAIT_POLL_FREQUENCY,
+        ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+    )
+
+# 스크롤 컨테이너 높이와 로드된 목록 행 수를 한 번의 호출로 조회
+JS_LIST_LOAD_STATE = "return [arguments[0].scrollHeight, document.querySelectorAll('ul.tableBody > li').length];"
+
+def _list_load_progressed(element, last_state: Tuple[int, int]):
+    """
+    WebDriverWait 조건: 새 행이 추가되었거나 스크롤 컨테이너 높이가 바뀌면 새 (높이, 행 수)를 반환합니다.
+    (기존 높이 기준 판정을 유지하되, 행 수가 줄어든 높이 변화는 진행으로 보지 않음)
+    """
+    last_height, last_count = last_state
+    def _condition(driver):
+        height, count = driver.execute_script(JS_LIST_LOAD_STATE, element)
+        if count > last_count or (height != last_height and count >= last_count):
+            return height, count
+        return False
+    return _condition
+
+# 요소를 화면 중앙으로 즉시 스크롤(애니메이션 없음)한 뒤 바로 클릭
+JS_SCROLL_AND_CLICK = "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'}); arguments[0].click();"
+
+def _scroll_and_click(driver, element, label: str) -> bool:
+    """
+    요소를 스크롤 후 JavaScript로 클릭합니다. (스크롤 안정화 대기 및 일반 클릭 재시도 없음)
+    """
+    try:
+        driver.execute_script(JS_SCROLL_AND_CLICK, element)
+        logger.info(f"✅ {label} 클릭 성공")
+        return True
+    except Exception as e:
+        logger.error(f"❌ {label} 클릭 실패: {e}")
+        return False
 
 def navigate_to_handover_document_list(driver):
     """
@@ -55,7 +241,7 @@ def navigate_to_handover_document_list(driver):
         # 가장 안정적인 텍스트 기반 XPath 사용
         XPATH_ELECTRONIC_APPROVAL = "//span[text()='전자결재']"
         
-        WebDriverWait(driver, 10).until(
+        _fast_wait(driver, 10).until(
             EC.element_to_be_clickable((By.XPATH, XPATH_ELECTRONIC_APPROVAL))
         ).click()
         
@@ -64,8 +250,8 @@ def navigate_to_handover_document_list(driver):
     except TimeoutException:
         logger.error("❌ 1단계: '전자결재' 메뉴를 찾거나 클릭할 수 없습니다. (Timeout)")
         return False
-    except Exception as e:
-        logger.error(f"❌ 1단계: 예상치 못한 오류 발생: {e}")
+    except WebDriverException as e:
+        logger.error(f"❌ 1단계: WebDriver 오류 발생: {e}")
         return False
     
     # --- 페이지 이동 후 로딩 대기 및 2단계 클릭 시작 ---
@@ -74,107 +260,44 @@ def navigate_to_handover_document_list(driver):
     try:
         # 1. 페이지 로딩 대기: 새로운 페이지에서 고유한 요소가 나타날 때까지 기다립니다.
         XPATH_APPROVAL_CONTENT_AREA = "//div[@id='sideLnb']"
-        WebDriverWait(driver, 15).until(
+        _fast_wait(driver, 15).until(
             EC.presence_of_element_located((By.XPATH, XPATH_APPROVAL_CONTENT_AREA))
         )
         logger.info("✅ 전자결재 페이지 내부 요소 로딩 완료 확인.")
         
-        # 추가 안정화 시간
-        time.sleep(2)
-        
         # 2. '인수인계' 상위 메뉴 찾기 및 클릭 (하위 메뉴 펼치기)
         XPATH_HANDOVER_PARENT_MENU = "//span[text()='인수인계']"
         
         logger.info("🔍 '인수인계' 상위 메뉴 탐색 중...")
-        handover_parent = WebDriverWait(driver, 10).until(
+        handover_parent = _fast_wait(driver, 10).until(
             EC.presence_of_element_located((By.XPATH, XPATH_HANDOVER_PARENT_MENU))
         )
         logger.info("✅ '인수인계' 상위 메뉴 요소 발견")
         
-        # 요소가 보이도록 스크롤
-        logger.info("📜 요소가 보이도록 스크롤 중...")
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", handover_parent)
-        time.sleep(1)
-        
-        # 클릭 가능할 때까지 대기
-        logger.info("⏳ 요소가 클릭 가능할 때까지 대기 중...")
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, XPATH_HANDOVER_PARENT_MENU))
-        )
-        
-        # 클릭 시도 (여러 방법)
-        click_success = False
-        
-        # 방법 1: 일반 클릭
-        try:
-            logger.info("🖱️ 방법 1: 일반 클릭 시도...")
-            handover_parent.click()
-            logger.info("✅ '인수인계' 상위 메뉴 클릭 성공 (일반 클릭)")
-            click_success = True
-        except Exception as e:
-            logger.warning(f"⚠️ 일반 클릭 실패: {e}")
-        
-        # 방법 2: JavaScript 클릭
-        if not click_success:
-            try:
-                logger.info("🖱️ 방법 2: JavaScript 클릭 시도...")
-                driver.execute_script("arguments[0].click();", handover_parent)
-                logger.info("✅ '인수인계' 상위 메뉴 클릭 성공 (JavaScript 클릭)")
-                click_success = True
-            except Exception as e:
-                logger.warning(f"⚠️ JavaScript 클릭 실패: {e}")
-        
-        if not click_success:
-            logger.error("❌ 모든 클릭 방법 실패")
+        # 즉시 스크롤 + JavaScript 클릭을 한 번의 호출로 수행 (레이어 메뉴에서도 항상 동작)
+        if not _scroll_and_click(driver, handover_parent, "'인수인계' 상위 메뉴"):
             return False
         
-        # 하위 메뉴가 펼쳐질 때까지 대기
-        logger.info("⏳ 하위 메뉴 펼쳐짐 대기 중...")
-        time.sleep(2)
-        
-        # 3. '인수인계문서' 서브 메뉴 클릭
+        # 3. '인수인계문서' 서브 메뉴 클릭 (하위 메뉴가 펼쳐져 보이는 즉시 진행)
         XPATH_HANDOVER_DOCUMENT = "//span[text()='인수인계문서']"
         
-        logger.info("🔍 '인수인계문서' 서브 메뉴 탐색 중...")
-        handover_doc = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, XPATH_HANDOVER_DOCUMENT))
+        logger.info("⏳ 하위 메뉴 펼쳐짐 대기 중...")
+        handover_doc = _fast_wait(driver, 10).until(
+            EC.visibility_of_element_located((By.XPATH, XPATH_HANDOVER_DOCUMENT))
         )
         logger.info("✅ '인수인계문서' 서브 메뉴 요소 발견")
         
-        # 요소가 보이도록 스크롤
-        logger.info("📜 요소가 보이도록 스크롤 중...")
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", handover_doc)
-        time.sleep(1)
-        
-        # 클릭 시도 (여러 방법)
-        click_success = False
-        
-        # 방법 1: 일반 클릭
-        try:
-            logger.info("🖱️ 방법 1: 일반 클릭 시도...")
-            handover_doc.click()
-            logger.info("✅ '인수인계문서' 서브 메뉴 클릭 성공 (일반 클릭)")
-            click_success = True
-        except Exception as e:
-            logger.warning(f"⚠️ 일반 클릭 실패: {e}")
-        
-        # 방법 2: JavaScript 클릭
-        if not click_success:
-            try:
-                logger.info("🖱️ 방법 2: JavaScript 클릭 시도...")
-                driver.execute_script("arguments[0].click();", handover_doc)
-                logger.info("✅ '인수인계문서' 서브 메뉴 클릭 성공 (JavaScript 클릭)")
-                click_success = True
-            except Exception as e:
-                logger.warning(f"⚠️ JavaScript 클릭 실패: {e}")
-        
-        if not click_success:
-            logger.error("❌ 모든 클릭 방법 실패")
+        if not _scroll_and_click(driver, handover_doc, "'인수인계문서' 서브 메뉴"):
             return False
         
-        # 최종 페이지 로딩 대기
+        # 최종 페이지 로딩 대기 (고정 30초 대신 목록 첫 행이 나타나는 즉시 진행)
         logger.info("⏳ 인수인계문서 목록 페이지 로딩 대기 중...")
-        time.sleep(30)
+        try:
+            _fast_wait(driver, 30).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "ul.tableBody > li"))
+            )
+        except TimeoutException:
+            logger.warning("⚠️ 목록 행이 30초 내에 나타나지 않았습니다. 빈 목록으로 간주하고 계속합니다.")
         
         logger.info("✅✅✅ '인수인계문서' 목록 페이지 이동 완료 ✅✅✅")
         return True
@@ -185,11 +308,11 @@ def navigate_to_handover_document_list(driver):
         try:
             driver.save_screenshot("debug_timeout_error.png")
             logger.info("💾 디버깅용 스크린샷 저장: debug_timeout_error.png")
-        except:
+        except WebDriverException:
             pass
         return False
-    except Exception as e:
-        logger.error(f"❌ 2단계: 예상치 못한 오류 발생: {e}")
+    except WebDriverException as e:
+        logger.error(f"❌ 2단계: WebDriver 오류 발생: {e}")
         return False
 
 def get_last_12_months():
@@ -199,10 +322,27 @@ def get_last_12_months():
     Returns:
         Tuple[str, str]: (시작일, 종료일) YYYY-MM-DD 형식
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=365)  # 약 12개월 전
+    # 결과는 날짜 단위로만 달라지므로 오늘 날짜를 키로 캐싱
+    return _last_12_months_for(date.today())
+
+@lru_cache(maxsize=1)
+def _last_12_months_for(today: date) -> Tuple[str, str]:
+    """ 기준일(today)로부터 최근 12개월 범위를 계산합니다. (get_last_12_months 캐시용) """
+    start_date = today - timedelta(days=365)  # 약 12개월 전
     
-    return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    return start_date.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+
+def _parse_ymd(text: str) -> datetime:
+    """
+    'YYYY-MM-DD' 문자열을 datetime으로 변환합니다.
+    (정형 문자열은 C 구현 fromisoformat으로 바로 변환하고, 그 외에는 strptime으로 동일하게 검증/오류 발생)
+    """
+    if len(text) == 10 and text[4] == '-' and text[7] == '-':
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            pass # 잘못된 값은 strptime에서 기존과 같은 오류 메시지로 처리
+    return datetime.strptime(text, "%Y-%m-%d")
 
 def parse_date_range(start_date_str: str, end_date_str: str) -> Tuple[str, str]:
     """
@@ -219,8 +359,8 @@ def parse_date_range(start_date_str: str, end_date_str: str) -> Tuple[str, str]:
         ValueError: 날짜 형식이 잘못된 경우
     """
     try:
-        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+        start_date = _parse_ymd(start_date_str)
+        end_date = _parse_ymd(end_date_str)
         
         if start_date > end_date:
             raise ValueError("시작 날짜가 종료 날짜보다 늦습니다")
@@ -235,106 +375,111 @@ def parse_date_range(start_date_str: str, end_date_str: str) -> Tuple[str, str]:
             raise ValueError("날짜 형식이 올바르지 않습니다. YYYY-MM-DD 형식을 사용하세요")
         raise
 
-def extract_document_list(driver, start_date: str, end_date: str, doc_keyword: str) -> List[Dict[str, Any]]:
+def _scroll_list_to_end(driver) -> bool:
     """
-    목록 페이지에서 특정 키워드가 포함된 문서들의 링크를 추출합니다.
-    (특정 목록 컨테이너 내부 스크롤 로직 적용)
+    목록 스크롤 컨테이너를 최하단까지 반복 스크롤하여 전체 행을 로드합니다.
+    
+    Returns:
+        bool: 스크롤 컨테이너를 찾았는지 여부
     """
-    documents = []
+    # 1. 스크롤 대상 요소 찾기 (인라인 스타일 속성을 이용한 정확한 탐색)
+    # CSS Selector: style 속성에 'overflow: scroll'을 포함하는 모든 DIV
+    SCROLL_CONTAINER_CSS = "div[style*='overflow: scroll']"
     
     try:
-        logger.info(f"📄 '{doc_keyword}' 키워드 문서 목록 추출 중...")
-        
-        # 1. 스크롤 대상 요소 찾기 (인라인 스타일 속성을 이용한 정확한 탐색)
-        # CSS Selector: style 속성에 'overflow: scroll'을 포함하는 모든 DIV
-        SCROLL_CONTAINER_CSS = "div[style*='overflow: scroll']"
+        # 10초 대기하여 스크롤 가능한 요소 확보
+        scrollable_element = WebDriverWait(driver, 0).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, SCROLL_CONTAINER_CSS))
+        )
+        logger.info("✅ 스크롤 대상 요소 (style*='overflow: scroll') 찾기 성공")
+    except TimeoutException:
+        logger.error("❌ 스크롤 대상 컨테이너를 찾지 못했습니다. 목록 영역이 로드되지 않았을 수 있습니다.")
+        return False
+    
+    # 2. 반복 스크롤 로직 실행 (전체 목록 로드를 보장)
+    last_state = tuple(driver.execute_script(JS_LIST_LOAD_STATE, scrollable_element))
+    max_attempts = 15 # 충분한 시도 횟수
+
+    for i in range(max_attempts):
+        logger.info(f"📜 [{i+1}차 스크롤] 목록 최하단으로 스크롤 중...")
         
+        # 스크롤 명령 실행 (요소 내부 스크롤을 최하단으로)
+        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_element)
+
+        # 고정 대기 대신 새 행이 로드되는 즉시 다음 스크롤 진행 (최대 3초, 다음 행을 늦게 반환하는 서버 대비)
         try:
-            # 10초 대기하여 스크롤 가능한 요소 확보
-            scrollable_element = WebDriverWait(driver, 0).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, SCROLL_CONTAINER_CSS))
+            last_state = _fast_wait(driver, 3).until(
+                _list_load_progressed(scrollable_element, last_state)
             )
-            logger.info("✅ 스크롤 대상 요소 (style*='overflow: scroll') 찾기 성공")
         except TimeoutException:
-            logger.error("❌ 스크롤 대상 컨테이너를 찾지 못했습니다. 목록 영역이 로드되지 않았을 수 있습니다.")
-            return documents
+            # 행 수와 스크롤 높이가 변하지 않으면 종료
+            logger.info("✅ 더 이상 새로운 행이 로드되지 않아 스크롤 종료.")
+            break
         
-        # 2. 반복 스크롤 로직 실행 (전체 목록 로드를 보장)
-        last_height = 0 
-        max_attempts = 15 # 충분한 시도 횟수
+    logger.info(f"✅ 반복 스크롤 완료.")
+    
+    return True
 
-        for i in range(max_attempts):
-            logger.info(f"📜 [{i+1}차 스크롤] 목록 최하단으로 스크롤 중...")
-            
-            # 스크롤 명령 실행 (요소 내부 스크롤을 최하단으로)
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_element)
-            time.sleep(3) # 데이터 로딩 및 안정화 대기
-            
-            # 새 높이 가져오기
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scrollable_element)
-            
-            # 스크롤 높이가 변하지 않으면 종료
-            if new_height == last_height:
-                logger.info("✅ 더 이상 새로운 행이 로드되지 않아 스크롤 종료.")
-                break 
-                
-            last_height = new_height
-            
-        logger.info(f"✅ 반복 스크롤 완료.")
+def extract_document_lists(driver, start_date: str, end_date: str, doc_keywords: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    목록 페이지를 한 번만 스크롤/파싱하여 키워드별 문서 링크 목록을 추출합니다.
+    (특정 목록 컨테이너 내부 스크롤 로직 적용)
+    
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: {키워드: 문서 목록}
+    """
+    documents_by_keyword = {keyword: [] for keyword in doc_keywords}
+    
+    try:
+        logger.info(f"📄 {doc_keywords} 키워드 문서 목록 추출 중...")
         
-        # 2. HTML 소스 가져오기 및 BeautifulSoup 파싱
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
+        # 조회 기간은 행마다 다시 파싱하지 않도록 루프 전에 한 번만 datetime으로 변환
+        try:
+            start = _parse_ymd(start_date)
+            end = _parse_ymd(end_date)
+        except ValueError:
+            logger.error(f"❌ 잘못된 조회 기간 형식: {start_date} ~ {end_date}")
+            return documents_by_keyword
+        current_year = datetime.now().year  # MM-DD 형식 기안일에 사용할 연도 (행마다 조회하지 않음)
         
-        # [UL 컨테이너 탐색]
-        document_list_container = soup.select_one('ul.tableBody') 
+        # 1. 목록 컨테이너를 끝까지 스크롤하여 전체 행 로드
+        if not _scroll_list_to_end(driver):
+            return documents_by_keyword
         
-        if not document_list_container:
-            logger.warning("⚠️ 품의서 목록 컨테이너 (ul.tableBody)를 찾을 수 없습니다")
-            return documents
-
-        # 2. LI 행들 추출
-        rows = document_list_container.find_all('li', recursive=False) 
-        logger.info(f"📊 총 {len(rows)}개의 행을 찾았습니다.")
-
-        for idx, row in enumerate(rows, 1):
+        # 2. 목록 영역 HTML만 가져와 lxml 스트리밍 파싱 (헤더/사이드바/스크립트는 트리로 만들지 않음)
+        page_source = driver.execute_script(JS_LIST_HTML) or driver.page_source
+        
+        # [UL 컨테이너 > LI 행들을 하나씩 처리]
+        row_count = 0
+        for idx, row in enumerate(_iter_list_rows(page_source), 1):
+            row_count = idx
             try:
-                # 1. 문서 제목 추출
-                title_element = row.select_one('.titDiv .title span')
-                if not title_element:
-                    title_element = row.select_one('.titDiv .title')
-                    if not title_element: continue
-                title = title_element.get_text(strip=True)
-                
-                # 2. 문서번호/링크 추출
-                info_links_container = row.select_one('.infoDiv .h-box')
-                if not info_links_container: continue
-
-                info_links = info_links_container.find_all('div', class_=lambda x: x and 'txt' in x and 'infoLink' in x)
-                if len(info_links) < 2: continue
-
-                link_text_element = info_links[1] 
-                link_href = link_text_element.get_text(strip=True) # 품의번호 텍스트
-                # 기안부서 추출 (문서번호에서 '-' 앞부분만)
-                dept = link_href.split('-', 1)[0].strip() if '-' in link_href else ''
+                # 0. 빠른 사전 필터링: 키워드/상태 문자열이 행 텍스트에 없으면 필드 추출 전에 건너뜀
+                row_text = row.text_content()
+                if not any(keyword in row_text for keyword in doc_keywords): continue
+                if '종결' not in row_text and '완료' not in row_text: continue
 
+                # 1. 문서 제목 / 문서번호 / 기안일 / 상태 추출 (행당 XPath 1회)
+                fields = _extract_row_fields(row)
+                if not fields: continue
+                title, link_href, date_text, status = fields
                 
-                # 3. 기안일, 상태 확인 및 필터링 (생략된 로직)
-                date_text = row.select_one('.dateText').get_text(strip=True)
-                status = row.select_one('.process .ellipsis2').get_text(strip=True)
-                
+                # 2. 저렴한 문자열 검사 먼저: 키워드 → 상태 (정규식 날짜 파싱 전에 대부분의 행을 걸러냄)
+                matched_keywords = [keyword for keyword in doc_keywords if keyword in title]
+                if not matched_keywords: continue
                 if '종결' not in status and '완료' not in status: continue
                 
+                # 3. 기안일 파싱 및 기간 필터링
                 # NOTE: parse_date_from_text, is_date_in_range 함수는 외부에서 정의되었다고 가정
-                doc_date = parse_date_from_text(date_text)
-                if not is_date_in_range(doc_date, start_date, end_date): continue
+                doc_date = parse_date_from_text(date_text, current_year)
+                if not is_date_in_range(doc_date, start, end): continue
                 
-                # 4. 키워드 필터링 및 데이터 구조화
-                if doc_keyword not in title: continue
+                # 4. 기안부서 추출 (문서번호에서 '-' 앞부분만) 및 데이터 구조화
+                dept = link_href.split('-', 1)[0].strip() if '-' in link_href else ''
                 doc_type = '매출품의' if '매출품의' in title else '매입품의'
 
                 document_data = {
-                    '기안일': doc_date.strftime('%Y-%m-%d'),
+                    '기안일': doc_date.date().isoformat(),  # strftime 포맷 해석 없이 'YYYY-MM-DD' 생성
                     '문서제목': title,
                     '기안부서': dept,
                     '문서번호': link_href,
@@ -343,21 +488,37 @@ def extract_document_list(driver, start_date: str, end_date: str, doc_keyword: s
                     '종결|완료' :  status
                 }
                 
-                documents.append(document_data)
-                logger.debug(f"✅ 문서 링크 추출: {title} - {doc_date.strftime('%Y-%m-%d')}")
+                for keyword in matched_keywords:
+                    documents_by_keyword[keyword].append(document_data)
+                # 행 루프 안의 디버그 로그는 %-포맷 인자로 넘겨 DEBUG 비활성 시 문자열 생성을 생략
+                logger.debug("✅ 문서 링크 추출: %s - %s", title, document_data['기안일'])
                 
             except Exception as e:
-                logger.warning(f"⚠️ [{idx}/{len(rows)}] 행 처리 중 오류: {e}")
+                logger.warning(f"⚠️ [{idx}] 행 처리 중 오류: {e}")
                 continue
         
-        logger.info(f"✅ '{doc_keyword}' 키워드 문서 {len(documents)}건 추출 완료")
+        if not row_count:
+            logger.warning("⚠️ 품의서 목록 컨테이너 (ul.tableBody)를 찾을 수 없습니다")
+            return documents_by_keyword
+        
+        logger.info(f"📊 총 {row_count}개의 행을 확인했습니다.")
+        
+        for keyword, documents in documents_by_keyword.items():
+            logger.info(f"✅ '{keyword}' 키워드 문서 {len(documents)}건 추출 완료")
         
     except Exception as e:
         logger.error(f"❌ 문서 목록 추출 중 오류: {e}", exc_info=True)
     
-    return documents
+    return documents_by_keyword
 
-def _extract_purchase_details(soup: BeautifulSoup) -> Dict[str, Any]:
+def extract_document_list(driver, start_date: str, end_date: str, doc_keyword: str) -> List[Dict[str, Any]]:
+    """
+    목록 페이지에서 특정 키워드가 포함된 문서들의 링크를 추출합니다.
+    (여러 키워드를 처리할 때는 목록을 한 번만 파싱하는 extract_document_lists 사용)
+    """
+    return extract_document_lists(driver, start_date, end_date, [doc_keyword])[doc_keyword]
+
+def _extract_purchase_details(tree) -> Dict[str, Any]:
     """
     매입품의 상세 페이지에서 '노란 배경 합계 영역' 금액 추출
     """
@@ -370,16 +531,14 @@ def _extract_purchase_details(soup: BeautifulSoup) -> Dict[str, Any]:
     
     try:
         # ✅ 배경색을 완벽히 일치 비교하지 않고, "포함" 여부로 검사
-        sum_cells = soup.find_all(['td', 'th'], 
-            style=lambda s: s and ('255, 241, 214' in s or 'FFF1D6' in s)
-        )
+        sum_cells = XP_PURCHASE_SUM_CELLS(tree)
 
         if len(sum_cells) < 3:
             logger.warning("⚠️ 노란 배경 합계 영역을 충분히 찾을 수 없습니다.")
             return detail_data
 
         # ✅ 뒤에서부터 3개가 '공급가액 / 부가세 / 합계금액'
-        clean = lambda x: _clean_amount(x.get_text(strip=True))
+        clean = lambda x: _clean_amount(_node_text(x))
 
         detail_data['합계금액'] = clean(sum_cells[-1])
         detail_data['부가세'] = clean(sum_cells[-2])
@@ -392,7 +551,7 @@ def _extract_purchase_details(soup: BeautifulSoup) -> Dict[str, Any]:
         
     return detail_data
 
-def _extract_sales_details_kakao(soup: BeautifulSoup) -> Dict[str, Any]:
+def _extract_sales_details_kakao(tree) -> Dict[str, Any]:
     """
     매출품의 카카오클라우드 상세 페이지에서 재무 정보를 추출합니다.
     ('합 계' 레이블을 찾아 9번째 셀에서 합계금액만 추출)
@@ -405,26 +564,22 @@ def _extract_sales_details_kakao(soup: BeautifulSoup) -> Dict[str, Any]:
     }
     
     try:
-        # '합 계' 텍스트를 포함하는 <tr> 찾기 (공백 정리하여 안정적으로 매칭)
-        total_rows = soup.find_all('tr')
-        total_row = None
-        
-        for row in total_rows:
-            row_text = re.sub(r'\s+', '', row.get_text(strip=True))
-            if '합계' in row_text and '합계' in re.sub(r'\s+', '', row.get_text(strip=True)):
-                total_row = row
-                break
+        # '합 계' 텍스트를 포함하는 <tr> 찾기 (XPath로 좁힌 후보 행만 공백 정리하여 매칭)
+        total_row = next(
+            (row for row in XP_TOTAL_ROW_CANDIDATES(tree) if '합계' in _RE_WHITESPACE.sub('', row.text_content())),
+            None
+        )
         
-        if not total_row:
+        if total_row is None:
             logger.warning("⚠️ '합 계' 행을 찾을 수 없습니다")
             return detail_data
         
         # 해당 행의 모든 셀 추출
-        cells = total_row.find_all(['td', 'th'])
+        cells = XP_DETAIL_CELLS(total_row)
         
         if len(cells) >= 9:
             # 9번째 셀 (인덱스 8)에서 합계금액 추출
-            detail_data['합계금액'] = _clean_amount(cells[8].get_text(strip=True))
+            detail_data['합계금액'] = _clean_amount(_node_text(cells[8]))
             logger.info("✅ 카카오클라우드 합계금액 추출 성공")
         else:
             logger.warning(f"⚠️ 셀이 부족합니다. {len(cells)}개만 발견 (9개 필요)")
@@ -434,7 +589,7 @@ def _extract_sales_details_kakao(soup: BeautifulSoup) -> Dict[str, Any]:
         
     return detail_data
 
-def _extract_sales_details_general(soup: BeautifulSoup) -> Dict[str, Any]:
+def _extract_sales_details_general(tree) -> Dict[str, Any]:
     """
     매출품의 일반 구조 상세 페이지에서 재무 정보를 추출합니다.
     (정제된 텍스트 레이블 기반으로 인접한 값 셀을 찾아 추출하는 최적화된 로직)
@@ -447,52 +602,30 @@ def _extract_sales_details_general(soup: BeautifulSoup) -> Dict[str, Any]:
     }
     
     try:
-        # 1. '발행금액' 텍스트를 포함하는 <tr> 행을 찾습니다. (행을 찾는 최초 필터링)
+        # 1. '발행금액' 텍스트를 포함하는 첫 <tr> 행을 찾습니다. (행을 찾는 최초 필터링)
         # 이 행에는 '발행금액' 레이블이 포함되어 있으므로 이 행을 먼저 필터링합니다.
-        target_row = None
-        for row in soup.find_all('tr'):
-             if '발행금액' in row.get_text():
-                 target_row = row
-                 break
+        target_rows = XP_ISSUE_AMOUNT_ROW(tree)
         
-        if not target_row:
+        if not target_rows:
             logger.warning("⚠️ '발행금액' 행(레이블)을 찾을 수 없습니다.")
             return detail_data
+        target_row = target_rows[0]
 
         logger.info("✅ '발행금액' 행 탐색 성공. 레이블 기반 값 추출 시작.")
         
-        # 2. 행 내에서 레이블을 찾고 바로 옆 셀(Next Sibling)에서 값을 추출합니다.
-        
-        labels_to_find = {
-            '공급가액': '공급가액',
-            '부가세': '부가세',
-            '합계금액': '합계금액'
-        }
-        
-        # 행 내의 모든 셀을 반복하며 레이블을 찾습니다.
-        for cell in target_row.find_all(['td', 'th']):
-            cell_clean_text = _clean_text(cell.get_text())
+        # 2. 후보 셀만 공백을 제거하여 레이블을 찾고 바로 옆 셀(Next Sibling)에서 값을 추출합니다.
+        for cell in XP_LABEL_CANDIDATE_CELLS(target_row):
+            cell_clean_text = _RE_WHITESPACE.sub('', cell.text_content())
             
-            # 레이블을 찾았다면, 바로 다음 형제 셀에서 값을 추출합니다.
-            if '공급가액' in cell_clean_text and detail_data['공급가액'] == 0:
-                value_cell = cell.find_next_sibling(['td', 'th'])
-                if value_cell:
-                    detail_data['공급가액'] = _clean_amount(value_cell.get_text(strip=True))
-                    logger.debug(f"✅ 공급가액 추출 완료: {detail_data['공급가액']}")
-
-            elif '부가세' in cell_clean_text and detail_data['부가세'] == 0:
-                value_cell = cell.find_next_sibling(['td', 'th'])
-                if value_cell:
-                    detail_data['부가세'] = _clean_amount(value_cell.get_text(strip=True))
-                    logger.debug(f"✅ 부가세 추출 완료: {detail_data['부가세']}")
+            for label in SALES_AMOUNT_LABELS:
+                if label in cell_clean_text and detail_data[label] == 0:
+                    value_cells = XP_NEXT_CELL(cell)
+                    if value_cells:
+                        detail_data[label] = _clean_amount(_node_text(value_cells[0]))
+                        logger.debug("✅ %s 추출 완료: %s", label, detail_data[label])
+                    break
             
-            elif '합계금액' in cell_clean_text and detail_data['합계금액'] == 0:
-                value_cell = cell.find_next_sibling(['td', 'th'])
-                if value_cell:
-                    detail_data['합계금액'] = _clean_amount(value_cell.get_text(strip=True))
-                    logger.debug(f"✅ 합계금액 추출 완료: {detail_data['합계금액']}")
-                    
-            # 모든 값을 찾았으면 종료 (옵션)
+            # 모든 값을 찾았으면 종료
             if detail_data['공급가액'] != 0 and detail_data['부가세'] != 0 and detail_data['합계금액'] != 0:
                 break
         
@@ -501,6 +634,17 @@ def _extract_sales_details_general(soup: BeautifulSoup) -> Dict[str, Any]:
         
     return detail_data
 
+def _fetch_detail_html(driver) -> str:
+    """
+    팝업 창에서 상세 정보 추출에 필요한 HTML을 가져옵니다. (실패 시 빈 문자열)
+    """
+    try:
+        # 필요한 table 영역만 받아 WebDriver 전송량과 파싱량을 줄임 (table이 없으면 전체 소스 사용)
+        return driver.execute_script(JS_DETAIL_TABLES_HTML) or driver.page_source
+    except Exception as e:
+        logger.error(f"❌ 상세 페이지 HTML 조회 중 오류: {e}")
+        return ''
+
 def extract_detail_amount(driver, document_type: str, document_title: str = '') -> Dict[str, Any]:
     """
     팝업 상세 페이지에서 재무 정보를 추출합니다.
@@ -510,6 +654,23 @@ def extract_detail_amount(driver, document_type: str, document_title: str = '')
         document_type: 문서 종류 ('매출품의' 또는 '매입품의')
         document_title: 문서 제목 (카카오클라우드 분기를 위해 필요)
         
+    Returns:
+        Dict[str, Any]: 추출된 재무 정보 (거래처명, 공급가액, 부가세, 합계금액)
+    """
+    # 알 수 없는 문서 종류는 HTML 조회(WebDriver 왕복) 없이 바로 빈 결과 반환
+    if document_type not in DOC_TYPE_LABELS:
+        return parse_detail_amount('', document_type, document_title)
+    return parse_detail_amount(_fetch_detail_html(driver), document_type, document_title)
+
+def parse_detail_amount(page_source: str, document_type: str, document_title: str = '') -> Dict[str, Any]:
+    """
+    팝업 상세 HTML에서 재무 정보를 추출합니다. (WebDriver를 사용하지 않으므로 별도 스레드에서 실행 가능)
+    
+    Args:
+        page_source: 팝업 상세 HTML
+        document_type: 문서 종류 ('매출품의' 또는 '매입품의')
+        document_title: 문서 제목 (카카오클라우드 분기를 위해 필요)
+        
     Returns:
         Dict[str, Any]: 추출된 재무 정보 (거래처명, 공급가액, 부가세, 합계금액)
     """
@@ -520,14 +681,18 @@ def extract_detail_amount(driver, document_type: str, document_title: str = '')
         '합계금액': 0
     }
     
+    # 알 수 없는 문서 종류는 파싱 전에 반환하여 HTML 트리 생성 비용을 생략
+    if document_type not in DOC_TYPE_LABELS:
+        logger.warning(f"⚠️ 알 수 없는 문서 종류: {document_type}")
+        return detail_data
+    
     try:
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
+        tree = lxml.html.document_fromstring(page_source)
         
         # 분기 1: '매입품의'
         if document_type == '매입품의':
             logger.info("🔍 매입품의 추출 로직 실행")
-            detail_data = _extract_purchase_details(soup)
+            detail_data = _extract_purchase_details(tree)
         
         # 분기 2: '매출품의'
         elif document_type == '매출품의':
@@ -536,15 +701,11 @@ def extract_detail_amount(driver, document_type: str, document_title: str = '')
             # Case 2-1: 카카오클라우드
             if '카카오클라우드' in document_title:
                 logger.info("🔍 카카오클라우드 문서 감지")
-                detail_data = _extract_sales_details_kakao(soup)
+                detail_data = _extract_sales_details_kakao(tree)
             # Case 2-2: 그 외 (일반 구조)
             else:
                 logger.info("🔍 일반 매출품의 문서 감지")
-                detail_data = _extract_sales_details_general(soup)
-        
-        # 분기되지 않은 경우
-        else:
-            logger.warning(f"⚠️ 알 수 없는 문서 종류: {document_type}")
+                detail_data = _extract_sales_details_general(tree)
             
         logger.info(f"✅ 상세 정보 추출 완료: {detail_data}")
         
@@ -561,112 +722,236 @@ def close_popup(driver):
     logger.info("🚪 팝업 닫기는 윈도우 컨텍스트 전환으로 처리됩니다")
     return True
 
-def run_full_crawling(driver, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+def _read_document_popup(driver, doc: Dict[str, Any], list_window: str) -> Optional[str]:
+    """
+    목록 창에서 문서 제목을 클릭해 팝업(새 창)을 열고, 상세 HTML을 가져온 뒤 목록 창으로 복귀합니다.
+    
+    Returns:
+        Optional[str]: 팝업 상세 HTML (실패 시 None)
+    """
+    try:
+        # --- a. 문서 제목 요소 찾기 및 클릭하여 팝업 띄우기 (목록 컨테이너 내부로 탐색 범위 제한) ---
+        XPATH_DOC_TITLE = f"//ul[{_xp_class('tableBody')}]//span[text()={_xpath_literal(doc['문서제목'])}]"
+        
+        title_span = _fast_wait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, XPATH_DOC_TITLE))
+        )
+        
+        # JavaScript 강제 클릭 (팝업을 띄우는 올바른 동작)
+        driver.execute_script("arguments[0].click();", title_span)
+        logger.info("✅ 문서 제목 클릭 성공. 팝업 로딩 대기 중...")
+
+        # *** 🌟 팝업(새 창) 컨텍스트 전환 🌟 ***
+        # 고정 대기 대신 팝업 창이 열리는 즉시 진행 (대기 조건이 새 창 핸들을 바로 반환하므로 핸들 목록을 다시 조회하지 않음)
+        try:
+            new_window = _fast_wait(driver, 10).until(
+                lambda d: next((h for h in d.window_handles if h != list_window), False)
+            )
+        except TimeoutException:
+            logger.warning("⚠️ 팝업 창이 감지되지 않아 윈도우 전환에 실패했습니다. 목록 페이지 유지.")
+            return None # 다음 문서로 이동 (목록 창으로 계속 진행)
+        
+        driver.switch_to.window(new_window)
+        logger.info(f"✅ 윈도우 전환 성공: 새 팝업 창으로 이동")
+        # *** 🌟 팝업 컨텍스트 전환 종료 🌟 ***
+
+        # 팝업 상세 내용 렌더링 대기 (추출에 사용하는 금액 레이블 셀이 나타나는 즉시 진행)
+        try:
+            _fast_wait(driver, 10).until(lambda d: d.execute_script(JS_DETAIL_CONTENT_READY))
+        except TimeoutException:
+            logger.warning(f"⚠️ 상세 금액 표가 10초 내에 나타나지 않았습니다. 현재 내용으로 추출합니다: {doc['문서제목']}")
+        
+        # --- b. 팝업 HTML 가져오기 (driver는 팝업을 보고 있음, 파싱은 호출 측에서 수행) ---
+        page_source = _fetch_detail_html(driver)
+        
+        # --- c. 팝업 닫기 ---
+        # 팝업 창 닫기
+        driver.close() 
+
+        # 메인(목록) 창으로 다시 전환
+        driver.switch_to.window(list_window)
+        logger.info("✅ 팝업 닫기 및 메인 창 복귀 완료.")
+        
+        return page_source
+            
+    except Exception as e:
+        logger.error(f"❌ 문서 처리 중 오류: {e}")
+        
+        # 오류 발생 시 복구 로직: 팝업이 열려있다면 닫고 메인 창으로 복귀
+        try: 
+            # 팝업이 열린 채 에러가 발생했다면 닫고 메인으로 복귀
+            if driver.current_window_handle != list_window:
+                driver.close()
+                driver.switch_to.window(list_window)
+        except: 
+            logger.error("🚨 오류 복구 중 심각한 오류 발생. 드라이버 상태 확인 필요.")
+        
+        return None # 다음 문서로 이동
+
+def _dumps_jsonl_line(record: Dict[str, Any]) -> bytes:
+    """ 레코드를 UTF-8 JSON 한 줄(bytes)로 직렬화합니다. (orjson이 있으면 네이티브 직렬화 사용) """
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+def _jsonl_record_writer(file) -> Callable[[Dict[str, Any]], None]:
+    """
+    통합된 문서 데이터를 한 줄씩 JSONL로 기록하는 함수를 반환합니다.
+    (병렬 세션에서 동시에 호출될 수 있으므로 쓰기는 잠금으로 보호하고, 크래시 대비 매 건 flush)
+    """
+    lock = threading.Lock()
+    
+    def _write(record: Dict[str, Any]) -> None:
+        line = _dumps_jsonl_line(record)
+        with lock:
+            file.write(line)
+            file.flush()
+    return _write
+
+def _combine_document_detail(doc: Dict[str, Any], page_source: str, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    팝업 HTML을 파싱하여 문서 정보와 상세 정보를 통합합니다.
+    on_result가 주어지면 통합 직후 호출합니다.
+    """
+    detail_info = parse_detail_amount(page_source, doc.get('구분', ''), doc.get('문서제목', ''))
+    combined_data = {
+        **doc,
+        **detail_info
+    }
+    if on_result:
+        on_result(combined_data)
+    return combined_data
+
+def _process_document_shard(driver, documents: List[Dict[str, Any]], on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    하나의 드라이버로 문서 묶음의 팝업 상세 정보를 순서대로 추출합니다.
+    팝업 HTML 파싱은 별도 스레드에서 수행하여 다음 문서의 팝업 열기/대기와 겹치게 합니다.
+    on_result가 주어지면 문서 한 건이 완료될 때마다 호출합니다.
+    """
+    pending = []
+    # 팝업을 닫으면 항상 같은 목록 창으로 복귀하므로 창 핸들은 루프 전에 한 번만 조회
+    list_window = driver.current_window_handle
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='detail-parse') as parser:
+        for idx, doc in enumerate(documents, 1):
+            logger.info(f"📄 [{idx}/{len(documents)}] {doc['문서제목']} 처리 중...")
+            page_source = _read_document_popup(driver, doc, list_window)
+            if page_source is not None:
+                pending.append((idx, parser.submit(_combine_document_detail, doc, page_source, on_result)))
+    
+    # 파싱 결과를 원래 문서 순서대로 수집
+    results = []
+    for idx, future in pending:
+        try:
+            results.append(future.result())
+            logger.info(f"✅ [{idx}/{len(documents)}] 데이터 통합 완료")
+        except Exception as e:
+            logger.error(f"❌ [{idx}/{len(documents)}] 상세 정보 통합 중 오류: {e}")
+    return results
+
+def _process_shard_with_new_driver(driver_factory: Callable[[], Any], documents: List[Dict[str, Any]], on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    driver_factory로 목록 페이지까지 이동한 새 드라이버를 만들어 문서 묶음을 처리하고 종료합니다.
+    """
+    driver = driver_factory()
+    if driver is None:
+        logger.error(f"❌ 작업용 WebDriver 준비 실패. {len(documents)}건을 건너뜁니다.")
+        return []
+    
+    try:
+        driver.implicitly_wait(0)
+        if not _scroll_list_to_end(driver):
+            return []
+        return _process_document_shard(driver, documents, on_result)
+    finally:
+        driver.quit()
+
+def _process_documents_parallel(driver, documents: List[Dict[str, Any]], driver_factory: Callable[[], Any], workers: int, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    문서 목록을 연속 구간으로 나누어 여러 WebDriver 세션에서 동시에 팝업을 처리합니다.
+    (첫 구간은 기존 드라이버가 처리하고, 결과는 원래 문서 순서대로 합칩니다)
+    """
+    shard_size = -(-len(documents) // workers)  # 올림 나눗셈
+    shards = [documents[i:i + shard_size] for i in range(0, len(documents), shard_size)]
+    logger.info("🧵 %d개 WebDriver 세션으로 병렬 처리 (세션당 최대 %d건)", len(shards), shard_size)
+    
+    with ThreadPoolExecutor(max_workers=len(shards) - 1) as executor:
+        futures = [executor.submit(_process_shard_with_new_driver, driver_factory, shard, on_result) for shard in shards[1:]]
+        results = _process_document_shard(driver, shards[0], on_result)
+        for future in futures:
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                logger.error(f"❌ 병렬 작업 처리 중 오류: {e}")
+    return results
+
+def run_full_crawling(driver, start_date: str, end_date: str, driver_factory: Optional[Callable[[], Any]] = None, workers: int = 1, raw_output: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     전체 크롤링 파이프라인을 실행합니다.
     (팝업(새 창)이 열리는 환경을 고려하여 윈도우 핸들 전환 로직을 추가했습니다.)
+    
+    Args:
+        driver: 인수인계문서 목록 페이지에 있는 Selenium WebDriver 인스턴스
+        start_date (str): 시작 날짜 (YYYY-MM-DD)
+        end_date (str): 종료 날짜 (YYYY-MM-DD)
+        driver_factory: 로그인 후 목록 페이지까지 이동한 새 WebDriver를 반환하는 함수 (병렬 처리용, 실패 시 None 반환)
+        workers (int): 팝업 처리에 사용할 WebDriver 세션 수 (2 이상이고 driver_factory가 있을 때 병렬 처리)
+        raw_output (str): 지정 시 통합된 문서 데이터를 완료되는 즉시 이 경로에 JSONL로 기록
     """
     all_data = []
+    raw_file = None
     
     try:
         logger.info("🚀 전체 크롤링 시작")
         
+        # implicit wait가 설정되어 있으면 모든 find_element 호출이 타임아웃만큼 폴링하므로 비활성화
+        driver.implicitly_wait(0)
+        
+        if driver.capabilities.get('pageLoadStrategy') != 'eager':
+            logger.info("💡 pageLoadStrategy가 'eager'가 아닙니다. setup_driver()로 생성한 드라이버 사용 시 탐색 대기가 줄어듭니다.")
+        
+        # 원본 데이터 스트리밍 기록 (중간에 중단되어도 완료된 문서까지는 보존)
+        on_result = None
+        if raw_output:
+            os.makedirs(os.path.dirname(raw_output) or '.', exist_ok=True)
+            raw_file = open(raw_output, 'wb')
+            on_result = _jsonl_record_writer(raw_file)
+            logger.info("💾 원본 데이터 JSONL 기록: %s", raw_output)
+        
         keywords = ['매출품의', '매입품의']
         
+        # 1. 목록 페이지를 한 번만 스크롤/파싱하여 두 키워드의 문서 링크를 함께 추출
+        documents_by_keyword = extract_document_lists(driver, start_date, end_date, keywords)
+        
+        document_list = []
         for keyword in keywords:
-            logger.info(f"📋 '{keyword}' 목록 추출 중...")
-            
-            # 1. 목록 페이지에서 문서 링크 추출
-            document_list = extract_document_list(driver, start_date, end_date, keyword)
-            
-            if not document_list:
-                logger.warning(f"⚠️ '{keyword}' 문서가 없습니다")
-                continue
-            
-            logger.info(f"✅ '{keyword}' 문서 {len(document_list)}건 발견")
-            
-            # 2. 각 문서 링크를 순회하며 상세 정보 추출 (팝업 제어)
-            for idx, doc in enumerate(document_list, 1):
-                list_window = driver.current_window_handle # 현재(목록) 창 핸들 저장
-                
-                try:
-                    logger.info(f"📄 [{idx}/{len(document_list)}] {doc['문서제목']} 처리 중...")
-                    
-                    # --- a. 문서 제목 요소 찾기 및 클릭하여 팝업 띄우기 ---
-                    XPATH_DOC_TITLE = f"//span[text()=\"{doc['문서제목']}\"]" 
-                    
-                    title_span = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, XPATH_DOC_TITLE))
-                    )
-                    
-                    # JavaScript 강제 클릭 (팝업을 띄우는 올바른 동작)
-                    driver.execute_script("arguments[0].click();", title_span)
-                    logger.info("✅ 문서 제목 클릭 성공. 팝업 로딩 대기 중...")
-                    time.sleep(2) # 팝업 창이 완전히 뜨기를 위한 짧은 고정 대기
-
-                    # *** 🌟 팝업(새 창) 컨텍스트 전환 🌟 ***
-                    new_window = None
-                    all_windows = driver.window_handles
-                    
-                    # 목록 창을 제외한 새로운 팝업 창 핸들 찾기
-                    for window in all_windows:
-                        if window != list_window:
-                            new_window = window
-                            driver.switch_to.window(new_window)
-                            logger.info(f"✅ 윈도우 전환 성공: 새 팝업 창으로 이동")
-                            break
-                    
-                    if not new_window:
-                        logger.warning("⚠️ 팝업 창이 감지되지 않아 윈도우 전환에 실패했습니다. 목록 페이지 유지.")
-                        continue # 다음 문서로 이동 (목록 창으로 계속 진행)
-                    # *** 🌟 팝업 컨텍스트 전환 종료 🌟 ***
-                    
-                    # --- b. 팝업 내부 정보 추출 (driver는 팝업을 보고 있음) ---
-                    doc_type = doc.get('구분', '')
-                    doc_title = doc.get('문서제목', '')
-                    detail_info = extract_detail_amount(driver, doc_type, doc_title) 
-                    
-                    # --- c. 팝업 닫기 및 통합 ---
-                    # 팝업 창 닫기
-                    driver.close() 
-
-                    # 메인(목록) 창으로 다시 전환
-                    driver.switch_to.window(list_window)
-                    logger.info("✅ 팝업 닫기 및 메인 창 복귀 완료.")
-                    
-                    # 문서 정보와 상세 정보 통합
-                    combined_data = {
-                        **doc,
-                        **detail_info
-                    }
-                    all_data.append(combined_data)
-                    logger.info(f"✅ [{idx}/{len(document_list)}] 데이터 통합 완료")
-                        
-                except Exception as e:
-                    logger.error(f"❌ 문서 처리 중 오류: {e}")
-                    
-                    # 오류 발생 시 복구 로직: 팝업이 열려있다면 닫고 메인 창으로 복귀
-                    try: 
-                        # 팝업이 열린 채 에러가 발생했다면 닫고 메인으로 복귀
-                        if driver.current_window_handle != list_window:
-                            driver.close()
-                            driver.switch_to.window(list_window)
-                    except: 
-                        logger.error("🚨 오류 복구 중 심각한 오류 발생. 드라이버 상태 확인 필요.")
-                    
-                    continue # 다음 문서로 이동
+            if documents_by_keyword[keyword]:
+                logger.info("✅ '%s' 문서 %d건 발견", keyword, len(documents_by_keyword[keyword]))
+                document_list.extend(documents_by_keyword[keyword])
+            else:
+                logger.warning("⚠️ '%s' 문서가 없습니다", keyword)
+        
+        # 2. 두 키워드의 문서를 합쳐 한 번에 상세 정보 추출 (병렬 처리 시 작업용 세션도 크롤링당 한 번만 생성)
+        if workers > 1 and driver_factory and len(document_list) > 1:
+            all_data.extend(_process_documents_parallel(driver, document_list, driver_factory, workers, on_result))
+        elif document_list:
+            all_data.extend(_process_document_shard(driver, document_list, on_result))
                     
     except Exception as e:
-        logger.error(f"❌ 전체 크롤링 파이프라인 중 예상치 못한 오류 발생: {e}")
+        logger.error("❌ 전체 크롤링 파이프라인 중 예상치 못한 오류 발생: %s", e)
+    
+    finally:
+        if raw_file:
+            raw_file.close()
         
     return all_data
 
-def parse_date_from_text(date_text: str) -> datetime:
+def parse_date_from_text(date_text: str, default_year: Optional[int] = None) -> datetime:
     """
     텍스트에서 날짜를 파싱합니다. (YYYY-MM-DD 또는 MM-DD 형식 지원)
     
     Args:
         date_text (str): 날짜가 포함된 텍스트 ('10-17 (금)', '2025.10.17' 등)
+        default_year (int): MM-DD 형식에 사용할 연도 (생략 시 현재 연도, 반복 호출 시 미리 계산해 전달)
         
     Returns:
         datetime: 파싱된 날짜
@@ -676,67 +961,57 @@ def parse_date_from_text(date_text: str) -> datetime:
     """
     
     # 불필요한 공백, 괄호, 요일 정보 제거 (예: '10-17 (금)' -> '10-17')
-    cleaned_text = re.sub(r'\s*\(.+\)', '', date_text).strip()
+    cleaned_text = _RE_PAREN_SUFFIX.sub('', date_text).strip()
     
-    # 1. 월-일 형식 파싱 로직 추가 (목록 페이지 형식)
-    month_day_pattern = r'(\d{1,2})[.-]\s*(\d{1,2})' 
-    match_md = re.search(month_day_pattern, cleaned_text)
+    # 가장 흔한 'YYYY-MM-DD' 형식은 정규식 없이 C 구현 fromisoformat으로 바로 변환
+    if len(cleaned_text) >= 10 and cleaned_text[4] == '-' and cleaned_text[7] == '-':
+        try:
+            return datetime.fromisoformat(cleaned_text[:10])
+        except ValueError:
+            pass # 'YYYY-M-D' 등은 아래 정규식 경로에서 처리
     
-    if match_md:
-        month, day = match_md.groups()
-        current_year = datetime.now().year
+    # 연도 포함 형식이 있으면 우선 사용하고, 없을 때만 MM-DD(현재 연도)를 사용
+    month_day = None
+    for match in _RE_DATE.finditer(cleaned_text):
+        kind = match.lastgroup
         try:
-            # 연도 정보가 없으므로 현재 연도를 사용합니다.
-            return datetime(current_year, int(month), int(day))
+            if kind == 'ymd':
+                return datetime(int(match['y1']), int(match['m1']), int(match['ymd']))
+            if kind == 'mdy':
+                return datetime(int(match['mdy']), int(match['m2']), int(match['d2']))
+            if month_day is None:
+                # 연도 정보가 없으므로 현재 연도를 사용합니다.
+                month_day = datetime(default_year or datetime.now().year, int(match['m3']), int(match['md']))
         except ValueError:
-            pass # 잘못된 월/일이면 다음 패턴 시도 (매우 드뭄)
-
-    
-    # 2. 기존 연도 포함 패턴 시도
-    date_patterns = [
-        r'(\d{4})[.-](\d{1,2})[.-](\d{1,2})', # YYYY-MM-DD, YYYY.MM.DD
-        r'(\d{4})/(\d{1,2})/(\d{1,2})',# YYYY/MM/DD
-        r'(\d{1,2})[.-](\d{1,2})[.-](\d{4})',# MM-DD-YYYY, MM.DD.YYYY
-    ]
-    
-    for pattern in date_patterns:
-        match = re.search(pattern, cleaned_text)
-        if match:
-            groups = match.groups()
-            if len(groups) == 3:
-                try:
-                    if len(groups[0]) == 4: # YYYY-MM-DD 형식
-                        year, month, day = groups
-                    else: # MM-DD-YYYY 형식
-                        month, day, year = groups
-                    
-                    return datetime(int(year), int(month), int(day))
-                except ValueError:
-                    continue
+            continue # 잘못된 월/일이면 다음 매칭 시도 (매우 드뭄)
+    
+    if month_day is not None:
+        return month_day
     
     # 파싱 실패 시, 기본값 반환 대신 오류 발생 (디버깅 지원)
     raise ValueError(f"날짜 텍스트 파싱 실패: 형식 '{date_text}'")
 
-def is_date_in_range(date: datetime, start_date: str, end_date: str) -> bool:
+def is_date_in_range(date: datetime, start: datetime, end: datetime) -> bool:
     """
     날짜가 지정된 범위 내에 있는지 확인합니다.
+    (행마다 호출되므로 기간 문자열 파싱은 호출 측에서 한 번만 수행)
     
     Args:
         date (datetime): 확인할 날짜
-        start_date (str): 시작 날짜 (YYYY-MM-DD)
-        end_date (str): 종료 날짜 (YYYY-MM-DD)
+        start (datetime): 시작 날짜
+        end (datetime): 종료 날짜
         
     Returns:
         bool: 범위 내 여부
     """
-    try:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        return start <= date <= end
-    except ValueError:
-        return False
+    return start <= date <= end
 
-def crawl_all_data(driver, start_date: str, end_date: str) -> pd.DataFrame:
+# 문서 종류 → 보고서 구분 값 (Categorical 범주 순서로도 사용)
+DOC_TYPE_LABELS = {'매출품의': '매출', '매입품의': '매입'}
+# DataFrame 생성 시 레코드에서 읽는 컬럼 (그 외 '링크' 등은 최종 결과에 쓰이지 않으므로 만들지 않음)
+RECORD_COLUMNS = ['기안일', '날짜', '문서제목', '구분', '공급가액', '거래처명', '부가세', '합계금액', '문서번호', '종결|완료']
+
+def crawl_all_data(driver, start_date: str, end_date: str, driver_factory: Optional[Callable[[], Any]] = None, workers: int = 1, raw_output: Optional[str] = None) -> pd.DataFrame:
     """
     모든 매출/매입 데이터를 크롤링하여 DataFrame으로 반환합니다.
     
@@ -744,6 +1019,9 @@ def crawl_all_data(driver, start_date: str, end_date: str) -> pd.DataFrame:
         driver: Selenium WebDriver 인스턴스
         start_date (str): 시작 날짜 (YYYY-MM-DD)
         end_date (str): 종료 날짜 (YYYY-MM-DD)
+        driver_factory: 병렬 팝업 처리용 WebDriver 생성 함수 (run_full_crawling 참고)
+        workers (int): 팝업 처리에 사용할 WebDriver 세션 수
+        raw_output (str): 원본 데이터 JSONL 기록 경로 (선택)
         
     Returns:
         pd.DataFrame: 추출된 데이터
@@ -754,18 +1032,25 @@ def crawl_all_data(driver, start_date: str, end_date: str) -> pd.DataFrame:
         logger.info("🚀 전체 데이터 크롤링 시작 (run_full_crawling 사용)")
 
         # 통합 크롤링 파이프라인 수행 (목록 → 팝업 상세 → 통합)
-        all_data = run_full_crawling(driver, start_date, end_date)
+        all_data = run_full_crawling(driver, start_date, end_date, driver_factory=driver_factory, workers=workers, raw_output=raw_output)
 
         if not all_data:
             logger.warning("⚠️ 추출된 데이터가 없습니다")
             return pd.DataFrame(columns=['날짜', '문서제목', '구분', '공급가액', '종결|완료'])
 
-        # DataFrame 생성 및 표준 컬럼 정리
-        df = pd.DataFrame(all_data)
+        # DataFrame 생성: 레코드(dict) 목록을 행 단위로 변환하지 않고 필요한 컬럼만 열 단위 리스트로 모아 한 번에 생성
+        columns = [c for c in RECORD_COLUMNS if c in all_data[0]]
+        df = pd.DataFrame({c: [record.get(c) for record in all_data] for c in columns})
+
+        # 금액 컬럼은 dtype을 명시하여 이후 단계의 object 추론/변환 비용 제거
+        amount_columns = [c for c in ['공급가액', '부가세', '합계금액'] if c in df.columns]
+        if amount_columns:
+            df[amount_columns] = df[amount_columns].fillna(0).astype('int64')
 
         # 날짜 컬럼 표준화: '기안일' → '날짜'
         if '기안일' in df.columns:
-            df['날짜'] = pd.to_datetime(df['기안일'], errors='coerce')
+            # 기안일은 extract_document_list에서 항상 '%Y-%m-%d'로 생성하므로 형식을 지정하여 추론 생략
+            df['날짜'] = pd.to_datetime(df['기안일'], format='%Y-%m-%d', errors='coerce', cache=True)
         elif '날짜' in df.columns:
             df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
         else:
@@ -773,9 +1058,13 @@ def crawl_all_data(driver, start_date: str, end_date: str) -> pd.DataFrame:
             logger.warning("⚠️ 날짜 컬럼을 찾을 수 없어 빈 데이터프레임을 반환합니다")
             return pd.DataFrame(columns=['날짜', '문서제목', '매입|매출', '공급가액', '종결|완료'])
 
-        # 구분 표준화: '매출품의'/'매입품의' → '매출'/'매입'
+        # 구분 표준화: '매출품의'/'매입품의' → '매출'/'매입' (고정 범주의 Categorical로 바로 생성)
         if '구분' in df.columns:
-            df['구분'] = df['구분'].replace({'매출품의': '매출', '매입품의': '매입'})
+            df['구분'] = pd.Categorical(df['구분'].map(DOC_TYPE_LABELS), categories=list(DOC_TYPE_LABELS.values()))
+
+        # 값 종류가 적은 상태 컬럼도 category로 변환 (분석 단계 groupby/필터 비용 절감)
+        if '종결|완료' in df.columns:
+            df['종결|완료'] = df['종결|완료'].astype('category')
 
         # 필수 금액 컬럼 보정
         if '공급가액' not in df.columns:
@@ -787,7 +1076,7 @@ def crawl_all_data(driver, start_date: str, end_date: str) -> pd.DataFrame:
         df = df[base_columns + extra_columns]
 
         # 정렬 및 완료 로그
-        df = df.sort_values('날짜')
+        df = df.sort_values('날짜', kind='mergesort', ignore_index=True)  # 안정 정렬: 같은 날짜는 수집 순서 유지 (인덱스는 정렬 시 바로 재생성)
         logger.info(f"✅ 총 {len(df)}건의 데이터 크롤링 완료")
 
         return df
@@ -10,8 +10,8 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.utils import get_column_letter
 import logging
 
@@ -30,58 +30,66 @@ def _prepare_detail_df(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame(columns=FINAL_DETAIL_COLUMNS)
 
-    prepared_df = df.copy()
-
-    # 날짜 → 기안일
-    if '날짜' in prepared_df.columns:
-        prepared_df = prepared_df.rename(columns={'날짜': '기안일'})
+    # 날짜 → 기안일 후 최종 시트에 쓰는 컬럼만 남김 (이후 변환/정렬이 불필요한 컬럼까지 복사하지 않음)
+    if '날짜' in df.columns:
+        prepared_df = df.rename(columns={'날짜': '기안일'})
+        prepared_df = prepared_df[[c for c in FINAL_DETAIL_COLUMNS if c in prepared_df.columns]]
     else:
         logger.error("❌ '날짜' 컬럼이 없어 처리 불가.")
         return pd.DataFrame(columns=FINAL_DETAIL_COLUMNS)
 
-    # 금액 컬럼 정수 변환
-    for col in ['공급가액', '부가세', '합계금액']:
-        if col in prepared_df.columns:
-            prepared_df[col] = pd.to_numeric(prepared_df[col], errors='coerce').fillna(0).astype(int)
+    # 금액 컬럼 정수 변환 (crawl_all_data 결과처럼 이미 정수형인 컬럼은 제외하고, 나머지는 한 번의 대입으로 교체)
+    amount_columns = [
+        c for c in ['공급가액', '부가세', '합계금액']
+        if c in prepared_df.columns and not pd.api.types.is_integer_dtype(prepared_df[c])
+    ]
+    if amount_columns:
+        prepared_df[amount_columns] = prepared_df[amount_columns].apply(pd.to_numeric, errors='coerce').fillna(0).astype(int)
+
+    # 값 종류가 적은 컬럼은 category로 맞춰 매출/매입·종결 필터가 문자열 대신 범주 코드로 비교되도록 함
+    # (crawl_all_data 결과는 이미 category이므로 다른 경로로 만든 DataFrame에만 적용)
+    for col in ['구분', '종결|완료']:
+        if col in prepared_df.columns and not isinstance(prepared_df[col].dtype, pd.CategoricalDtype):
+            prepared_df[col] = prepared_df[col].astype('category')
 
     # 기안일 기준 정렬
     if '기안일' in prepared_df.columns:
         prepared_df = prepared_df.sort_values('기안일').reset_index(drop=True)
 
-    # 최종 컬럼 순서 적용
-    final_columns = [c for c in FINAL_DETAIL_COLUMNS if c in prepared_df.columns]
-    return prepared_df[final_columns]
+    return prepared_df
 
 def process_monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame(columns=['년월', '매출액', '매입액', '손익'])
     
-    df_copy = df.copy()
-    df_copy['년월'] = df_copy['날짜'].dt.to_period('M').astype(str)
-
-    summary_df = df_copy.groupby(['년월', '구분'])['공급가액'].sum().unstack(fill_value=0).reset_index()
-    summary_df = summary_df.rename(columns={'매출': '매출액', '매입': '매입액'})
-
-    for col in ['년월', '매출액', '매입액']:
-        if col not in summary_df.columns:
-            summary_df[col] = 0
-
+    # 전체 DataFrame 복사 없이 년월 키만 만들어 공급가액 컬럼 하나를 집계
+    year_month = df['날짜'].dt.to_period('M').astype(str).rename('년월')
+
+    # groupby가 년월 순으로 정렬된 결과를 반환하므로 별도 정렬 불필요, 없는 구분 컬럼은 reindex로 한 번에 0 채움
+    summary_df = (
+        df['공급가액'].groupby([year_month, df['구분']], observed=True).sum()
+        .unstack(fill_value=0)
+        .rename(columns={'매출': '매출액', '매입': '매입액'})
+        .reindex(columns=['매출액', '매입액'], fill_value=0)
+    )
     summary_df['손익'] = summary_df['매출액'] - summary_df['매입액']
-    summary_df = summary_df.sort_values('년월').reset_index(drop=True)
     
-    return summary_df[['년월', '매출액', '매입액', '손익']]
+    return summary_df.reset_index().rename_axis(columns=None)
 
 def create_profit_analysis(monthly_df: pd.DataFrame) -> pd.DataFrame:
     if monthly_df.empty:
         return pd.DataFrame(columns=['년월','매출액','매입액','손익','누적손익','수익률','매출증감률','손익증감률'])
     
-    df = monthly_df.copy()
-    df['누적손익'] = df['손익'].cumsum()
-    df['수익률'] = np.where(df['매출액'] > 0, (df['손익'] / df['매출액'] * 100).round(2), 0)
-    df['매출증감률'] = df['매출액'].pct_change().fillna(0) * 100
-    df['손익증감률'] = df['손익'].pct_change().fillna(0) * 100
-
-    return df[['년월','매출액','매입액','손익','누적손익','수익률','매출증감률','손익증감률']]
+    # 월별 요약 전체를 복사한 뒤 컬럼을 추가하지 않고, 필요한 컬럼에 파생 컬럼을 붙인 새 DataFrame을 바로 생성
+    sales = monthly_df['매출액']
+    profit = monthly_df['손익']
+    return monthly_df[['년월', '매출액', '매입액', '손익']].assign(
+        누적손익=profit.cumsum(),
+        # 매출액이 있는 달만 나눗셈을 수행 (0 나눗셈 경고 및 버려질 비율 계산 생략)
+        수익률=(np.divide(profit, sales, out=np.zeros(len(sales)), where=sales.to_numpy() > 0) * 100).round(2),
+        매출증감률=sales.pct_change().fillna(0) * 100,
+        손익증감률=profit.pct_change().fillna(0) * 100,
+    )
 
 def export_to_excel(detailed_df: pd.DataFrame, monthly_df: pd.DataFrame, analysis_df: pd.DataFrame, filename: str = None) -> str:
     """
@@ -103,8 +111,8 @@ def export_to_excel(detailed_df: pd.DataFrame, monthly_df: pd.DataFrame, analysi
             filename = f"매출매입현황_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         filepath = os.path.join(output_dir, filename)
 
-        wb = Workbook()
-        wb.remove(wb.active)
+        # write-only 모드: 행을 추가하는 즉시 XML로 기록하여 셀 객체를 메모리에 쌓지 않음 (기본 시트도 생성되지 않음)
+        wb = Workbook(write_only=True)
 
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="366092", fill_type="solid")
@@ -116,34 +124,34 @@ def export_to_excel(detailed_df: pd.DataFrame, monthly_df: pd.DataFrame, analysi
         # 기간 상세
         if not prepared_df.empty:
             ws = wb.create_sheet("기간 상세 내역")
-            add_dataframe_to_sheet(ws, prepared_df, "전체 거래 내역")
-            format_worksheet(ws, prepared_df, header_font, header_fill, header_align, number_format)
+            add_dataframe_to_sheet(ws, prepared_df, "전체 거래 내역", header_font, header_fill, header_align, number_format)
+
+        # 종결 문서 필터는 한 번만 계산하고, 매출/매입 분리는 groupby 한 번으로 처리
+        closed_df = prepared_df[prepared_df['종결|완료'].str.contains('종결', na=False)]
+        closed_by_type = dict(tuple(closed_df.groupby('구분', observed=True, sort=False)))
+        empty_df = closed_df.iloc[0:0]
 
         # 매출내역
-        sales_df = prepared_df[(prepared_df['구분'] == '매출') & (prepared_df['종결|완료'].str.contains('종결', na=False))]
+        sales_df = closed_by_type.get('매출', empty_df)
         if not sales_df.empty:
             ws = wb.create_sheet("매출내역")
-            add_dataframe_to_sheet(ws, sales_df, "상세 매출 내역")
-            format_worksheet(ws, sales_df, header_font, header_fill, header_align, number_format)
+            add_dataframe_to_sheet(ws, sales_df, "상세 매출 내역", header_font, header_fill, header_align, number_format)
 
         # 매입내역
-        purchase_df = prepared_df[(prepared_df['구분'] == '매입') & (prepared_df['종결|완료'].str.contains('종결', na=False))]
+        purchase_df = closed_by_type.get('매입', empty_df)
         if not purchase_df.empty:
             ws = wb.create_sheet("매입내역")
-            add_dataframe_to_sheet(ws, purchase_df, "상세 매입 내역")
-            format_worksheet(ws, purchase_df, header_font, header_fill, header_align, number_format)
+            add_dataframe_to_sheet(ws, purchase_df, "상세 매입 내역", header_font, header_fill, header_align, number_format)
 
         # 월별 요약
         if not monthly_df.empty:
             ws = wb.create_sheet("월별요약")
-            add_dataframe_to_sheet(ws, monthly_df, "월별 매출/매입 요약")
-            format_worksheet(ws, monthly_df, header_font, header_fill, header_align, number_format)
+            add_dataframe_to_sheet(ws, monthly_df, "월별 매출/매입 요약", header_font, header_fill, header_align, number_format)
 
         # 손익 분석
         if not analysis_df.empty:
             ws = wb.create_sheet("손익분석")
-            add_dataframe_to_sheet(ws, analysis_df, "손익 분석")
-            format_worksheet(ws, analysis_df, header_font, header_fill, header_align, number_format)
+            add_dataframe_to_sheet(ws, analysis_df, "손익 분석", header_font, header_fill, header_align, number_format)
 
         wb.save(filepath)
         logger.info(f"✅ Excel 생성 완료 → {filepath}")
@@ -153,38 +161,65 @@ def export_to_excel(detailed_df: pd.DataFrame, monthly_df: pd.DataFrame, analysi
         logger.error(f"❌ Excel 생성 실패: {e}")
         raise
 
-def add_dataframe_to_sheet(ws, df, title: str):
-    ws['A1'] = title
-    ws['A1'].font = Font(size=14, bold=True)
-
-    for r in dataframe_to_rows(df, index=False, header=True):
-        ws.append(r)
+def add_dataframe_to_sheet(ws, df, title: str, header_font, header_fill, header_align, number_format):
+    """
+    write-only 시트에 제목(1행), 헤더(2행), 데이터(3행~)를 순서대로 기록합니다.
+    (기록한 셀은 다시 읽거나 수정할 수 없으므로 열 너비와 서식을 행 추가 전에 모두 결정)
+    """
+    format_worksheet(ws, df, title)
 
-def format_worksheet(ws, df, header_font, header_fill, header_align, number_format):
-    if df.empty: return
+    title_cell = WriteOnlyCell(ws, value=title)
+    title_cell.font = Font(size=14, bold=True)
+    ws.append([title_cell])
 
-    for col in range(1, len(df.columns) + 1):
-        cell = ws.cell(row=2, column=col)
+    header_cells = []
+    for col_name in df.columns:
+        cell = WriteOnlyCell(ws, value=col_name)
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = header_align
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # 열 이름으로 서식을 한 번만 결정하고, 서식이 없는 열의 값은 셀 객체 없이 그대로 추가
+    column_formats = []
+    for col_name in df.columns:
+        if '률' in col_name:
+            column_formats.append('0.00%')
+        elif any(x in col_name for x in ['액', '금액']):
+            column_formats.append(number_format)
+        else:
+            column_formats.append(None)
+
+    # 행 튜플을 하나씩 조립하는 itertuples 대신 object 배열로 한 번에 변환한 뒤 tolist()로 파이썬 리스트 행을 얻음
+    for row in df.to_numpy(dtype=object).tolist():
+        ws.append([_format_cell(ws, value, fmt) if fmt else value for value, fmt in zip(row, column_formats)])
+
+def _format_cell(ws, value, number_format):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = number_format
+    return cell
+
+def format_worksheet(ws, df, title: str):
+    """
+    데이터 기준으로 열 너비를 설정합니다. (write-only 시트는 행 추가 전에 호출해야 적용됨)
+    """
+    if df.empty: return
 
     for col_idx, col_name in enumerate(df.columns, 1):
-        is_amount = any(x in col_name for x in ['액','금액'])
-        is_percent = any(x in col_name for x in ['률'])
-        for row in range(3, len(df) + 3):
-            cell = ws.cell(row=row, column=col_idx)
-            if is_percent:
-                cell.number_format = '0.00%'
-            elif is_amount:
-                cell.number_format = number_format
-
-    for col_idx, column in enumerate(ws.columns, 1):
-        max_length = 0
-        column_letter = get_column_letter(col_idx)
-        for cell in column:
-            try:
-                max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        ws.column_dimensions[column_letter].width = min(max_length * 1.2 + 2, 50)
+        # 제목 행은 첫 열에만 값이 있고 나머지 열은 빈 셀('None', 4자)로 계산되던 기존 너비 기준 유지
+        max_length = len(str(title)) if col_idx == 1 else 4
+        max_length = max(max_length, len(str(col_name)), _max_text_length(df[col_name]))
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length * 1.2 + 2, 50)
+
+def _max_text_length(series: pd.Series) -> int:
+    """
+    열 값의 최대 문자 길이를 셀마다 str()을 호출하지 않고 열 단위 문자열 연산으로 계산합니다.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # 날짜는 datetime 셀로 기록되므로 str(Timestamp)와 같은 'YYYY-MM-DD HH:MM:SS' 길이로 계산
+        texts = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+    else:
+        texts = series.astype(str)
+    max_length = texts.str.len().max()
+    return 0 if pd.isna(max_length) else int(max_length)
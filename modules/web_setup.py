@@ -4,6 +4,8 @@ Chrome WebDriver를 headless 모드로 설정하고 Amaranth 그룹웨어에 자
 """
 # [추가] ----------------------------------------------------
 from selenium.webdriver.common.keys import Keys
+import os
+import json
 import time
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -11,23 +13,42 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 import logging
+from functools import lru_cache
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+# 로깅 설정은 진입점(main.setup_logging)에서 담당하고, 모듈은 로거만 사용
 logger = logging.getLogger(__name__)
 
-def setup_driver(headless=True):
+# 로그인 세션 쿠키 캐시 (재실행 시 로그인 생략)
+SESSION_CACHE_PATH = os.path.join(".cache", "session.json")
+SESSION_TTL_SECONDS = 20 * 60
+
+# 명시적 대기 폴링 간격 (기본 0.5초 대신 0.1초마다 확인하여 요소가 나타나는 즉시 진행, data_crawler/main도 이 값을 사용)
+WAIT_POLL_FREQUENCY = 0.1
+
+# 로그인 완료(메인 화면 진입) 확인용 요소: 메인 화면의 '전자결재' 메뉴 (main.py 로그인 확인과 세션 복원 확인에 공통 사용)
+MAIN_PAGE_READY_XPATH = "//span[text()='전자결재']"
+
+@lru_cache(maxsize=1)
+def _chrome_driver_path():
+    """
+    ChromeDriver 경로를 프로세스당 한 번만 확인합니다.
+    (병렬 작업용 드라이버를 여러 개 만들 때마다 webdriver-manager 버전 확인을 반복하지 않음)
+    """
+    return ChromeDriverManager().install()
+
+def setup_driver(headless=True, remote_url=None):
     """
     Chrome WebDriver를 설정하고 반환합니다.
     
     Args:
         headless (bool): headless 모드 사용 여부 (기본값: True)
+        remote_url (str): Selenium Grid 허브 URL (지정 시 로컬 Chrome 대신 Grid 노드에서 세션 생성)
     
     Returns:
-        webdriver.Chrome: 설정된 Chrome WebDriver 인스턴스
+        webdriver.Chrome | webdriver.Remote: 설정된 WebDriver 인스턴스
     """
     try:
         # Chrome 옵션 설정
@@ -43,14 +64,44 @@ def setup_driver(headless=True):
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
-        # WebDriverManager를 사용하여 ChromeDriver 자동 설치
-        service = Service(ChromeDriverManager().install())
+        # DOMContentLoaded 시점에 driver.get() 반환 (이후 요소 대기는 WebDriverWait로 처리)
+        chrome_options.page_load_strategy = 'eager'
+
+        # 팝업이 열려 있는 동안 뒤에 있는 목록 창의 타이머/렌더러가 절전되지 않도록 하고, 자동화에 쓰지 않는 부가 기능은 끔
+        chrome_options.add_argument('--disable-background-timer-throttling')
+        chrome_options.add_argument('--disable-renderer-backgrounding')
+        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-sync')
+        chrome_options.add_argument('--disable-features=Translate')
+
+        # 스크래핑에 불필요한 이미지/웹폰트 로딩 차단 (JS와 CSS는 로그인·메뉴 클릭 판정에 필요하므로 유지)
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+
+        if remote_url:
+            # Selenium Grid 노드에서 세션 생성 (병렬 세션이 로컬 CPU/메모리를 나눠 쓰지 않음)
+            driver = webdriver.Remote(command_executor=remote_url, options=chrome_options)
+        else:
+            # WebDriverManager를 사용하여 ChromeDriver 자동 설치
+            service = Service(_chrome_driver_path())
+            
+            # WebDriver 생성
+            driver = webdriver.Chrome(service=service, options=chrome_options)
         
-        # WebDriver 생성
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # 명시적 대기(WebDriverWait)만 사용: implicit wait와 섞이면 대기 시간이 중첩되므로 생성 시점부터 비활성화
+        driver.implicitly_wait(0)
         
-        # 자동화 감지 방지
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        # 자동화 감지 방지: 현재 빈 페이지에 한 번 실행하던 방식 대신, 이후 열리는 모든 문서(팝업/프레임 포함)에서 페이지 스크립트보다 먼저 실행되도록 등록
+        hide_webdriver_js = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": hide_webdriver_js})
+        except Exception:
+            # CDP 명령을 전달하지 않는 Remote(Grid) 환경에서는 기존 방식으로 현재 문서에만 적용
+            driver.execute_script(hide_webdriver_js)
         
         logger.info("✅ Chrome WebDriver 설정 완료")
         return driver
@@ -59,141 +110,6 @@ def setup_driver(headless=True):
         logger.error(f"❌ WebDriver 설정 실패: {e}")
         raise
 
-    """
-    Amaranth 그룹웨어에 로그인합니다.
-    
-    Args:
-        driver: Selenium WebDriver 인스턴스
-        url (str): 그룹웨어 URL
-        user_id (str): 로그인 ID
-        password (str): 로그인 비밀번호
-        
-    Returns:
-        bool: 로그인 성공 여부
-    """
-    try:
-        logger.info(f"🌐 그룹웨어 접속 중: {url}")
-        driver.get(url)
-        
-        # 페이지 로딩 대기
-        time.sleep(3)
-        
-        # 로그인 필드 찾기 및 입력
-        logger.info("🔑 로그인 정보 입력 중...")
-        
-        # ID 필드 찾기 및 입력
-        try:
-            #1단계 : 아이디 입력 및 다음 버튼 클릭
-            #ID 필드 찾기 및 입력력
-            id_field = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "reqLoginId"))
-            )
-            id_field.clear()
-            id_field.send_keys(user_id)
-            
-            #다음 버튼 클릭릭
-            next_button = driver.find_element(By.XPATH, "//button[.//span[text()='다음']]")
-            next_button.click()
-            logger.info("✅ '다음' 버튼 클릭 완료")
-            logger.info("✅ ID 입력 완료")
-        except TimeoutException:
-            logger.error("❌ ID 필드를 찾을 수 없습니다 (login_id)")
-            return False
-        
-        # 비밀번호 필드 찾기 및 입력
-        try:
-            pw_field = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "reqLoginPw"))
-            )
-            pw_field.clear()
-            pw_field.send_keys(password)
-            logger.info("✅ 비밀번호 입력 완료")
-        except NoSuchElementException:
-            logger.error("❌ 비밀번호 필드를 찾을 수 없습니다 (login_pw)")
-            return False
-        
-        # 로그인 버튼 클릭
-        try:
-            # CSS Selector로 로그인 버튼 찾기
-            login_button = driver.find_element(By.CSS_SELECTOR, "//button[.//span[text()='로그인']]")
-            login_button.click()
-            logger.info("✅ 로그인 버튼 클릭 완료")
-        except NoSuchElementException:
-            # 클래스 이름이 변경된 경우 XPath로 '로그인' 텍스트를 포함하는 버튼 찾기
-            try:
-                login_button = driver.find_element(By.XPATH, "//button[contains(text(), '로그인')]")
-                login_button.click()
-                logger.info("✅ 로그인 버튼 클릭 완료 (XPath 대체)")
-            except NoSuchElementException:
-                logger.warning("⚠️ 로그인 버튼을 찾을 수 없습니다. Enter 키로 로그인 시도")
-                pw_field.send_keys("\n")
-        except Exception as e:
-            logger.warning(f"⚠️ 로그인 버튼 클릭 실패, Enter 키로 시도: {e}")
-            pw_field.send_keys("\n")
-        
-        # 로그인 성공 확인 (다중 검증 방식)
-        try:
-            logger.info("🔍 로그인 성공 확인 중...")
-            
-            # 1단계: 로그인 폼이 사라졌는지 확인 (가장 확실한 방법)
-            try:
-                WebDriverWait(driver, 10).until_not(
-                    EC.presence_of_element_located((By.ID, "reqLoginId"))
-                )
-                logger.info("✅ 로그인 폼이 사라짐 확인")
-            except TimeoutException:
-                logger.warning("⚠️ 로그인 폼이 여전히 존재합니다")
-            
-            # 2단계: 페이지 로딩 완료 대기
-            wait_for_page_load(driver, 10)
-            
-            # 3단계: 로그인 후 나타나는 요소들 확인 (여러 선택자 시도)
-            success_indicators = [
-                "//input[@placeholder='통합 검색']",  # 통합 검색 필드
-                "//div[contains(@class, 'dashboard')]",  # 대시보드
-                "//nav[contains(@class, 'menu')]",  # 메뉴 네비게이션
-                "//div[contains(@class, 'main-content')]",  # 메인 콘텐츠
-                "//header[contains(@class, 'header')]"  # 헤더
-            ]
-            
-            login_success = False
-            for indicator in success_indicators:
-                try:
-                    WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.XPATH, indicator))
-                    )
-                    logger.info(f"✅ 로그인 성공 지표 발견: {indicator}")
-                    login_success = True
-                    break
-                except TimeoutException:
-                    continue
-            
-            # 4단계: URL 변경 확인 (SPA가 아닌 경우)
-            if not login_success:
-                try:
-                    WebDriverWait(driver, 5).until(
-                        lambda driver: driver.current_url != url and 
-                        "login" not in driver.current_url.lower()
-                    )
-                    logger.info("✅ URL 변경으로 로그인 성공 확인")
-                    login_success = True
-                except TimeoutException:
-                    pass
-            
-            if login_success:
-                logger.info("✅ 로그인 성공")
-                return True
-            else:
-                logger.error("❌ 로그인 실패: 성공 지표를 찾을 수 없습니다")
-                return False
-            
-        except Exception as e:
-            logger.error(f"❌ 로그인 확인 중 오류: {e}")
-            return False
-            
-    except Exception as e:
-        logger.error(f"❌ 로그인 중 오류 발생: {e}")
-        return False
 def login_groupware(driver, url, user_id, password):
     # HTML 선택자 정의 (유지보수 용이)
     ID_FIELD_ID = "reqLoginId"
@@ -206,13 +122,15 @@ def login_groupware(driver, url, user_id, password):
     try:
         logger.info(f"🌐 그룹웨어 접속 중: {url}")
         driver.get(url)
-        time.sleep(3) 
+        
+        # 단계별 대기에 재사용 (고정 대기 없이 WAIT_POLL_FREQUENCY 간격으로 다음 요소를 확인)
+        wait = WebDriverWait(driver, WAIT_TIME, poll_frequency=WAIT_POLL_FREQUENCY)
 
         # --- [1단계: ID 입력 및 다음 버튼 클릭] ---
         logger.info("🔑 1단계: ID 입력 및 다음 버튼 탐색 중...")
         
         # ID 필드 찾기 및 입력 (클릭 가능할 때까지 대기)
-        id_field = WebDriverWait(driver, WAIT_TIME).until(
+        id_field = wait.until(
             # [수정] EC.presence_of_element_located -> EC.element_to_be_clickable로 변경 (Interactable 보장)
             EC.element_to_be_clickable((By.ID, ID_FIELD_ID))
         )
@@ -220,7 +138,7 @@ def login_groupware(driver, url, user_id, password):
         id_field.send_keys(user_id)
         
         # '다음' 버튼 클릭 (클릭 가능할 때까지 대기)
-        next_button = WebDriverWait(driver, WAIT_TIME).until(
+        next_button = wait.until(
             EC.element_to_be_clickable((By.XPATH, NEXT_BTN_XPATH))
         )
         next_button.click()
@@ -231,7 +149,7 @@ def login_groupware(driver, url, user_id, password):
         logger.info("🔑 2단계: PW 필드 대기 및 정보 입력 중...")
         
         # [핵심 수정] PW 필드가 나타나고 조작 가능할 때까지 대기 (Interactable 해결)
-        pw_field = WebDriverWait(driver, WAIT_TIME).until(
+        pw_field = wait.until(
             EC.element_to_be_clickable((By.ID, PW_FIELD_ID))
         )
         pw_field.clear()
@@ -239,7 +157,7 @@ def login_groupware(driver, url, user_id, password):
         logger.info("✅ 비밀번호 입력 완료")
         
         # '로그인' 버튼 클릭
-        login_button = WebDriverWait(driver, WAIT_TIME).until(
+        login_button = wait.until(
             EC.element_to_be_clickable((By.XPATH, LOGIN_BTN_XPATH))
         )
         login_button.click()
@@ -261,13 +179,13 @@ def login_groupware(driver, url, user_id, password):
         logger.info("🌟🌟🌟 로그인 성공 및 메인 페이지 진입 확인 완료 🌟🌟🌟")
         return True
             
-    # [에러 처리 수정] NoSuchElementException은 더 이상 발생하지 않도록 코드를 개선했으므로, 
-    # TimeoutException과 일반 Exception만 포괄적으로 처리합니다.
+    # [에러 처리 수정] 예상 가능한 WebDriver 오류만 실패(False)로 처리하고,
+    # 그 외 예외는 호출부(main.py)의 최상위 처리기에서 스택 트레이스와 함께 기록되도록 전파합니다.
     except TimeoutException as te:
-        logger.error(f"❌ 로그인 타임아웃 오류: 특정 요소를 10초 내에 찾을 수 없습니다. (오류: {te})", exc_info=True)
+        logger.error(f"❌ 로그인 타임아웃 오류: 특정 요소를 10초 내에 찾을 수 없습니다. (오류: {te})")
         return False
-    except Exception as e:
-        logger.error(f"❌ 로그인 중 치명적인 오류 발생: {e}", exc_info=True)
+    except WebDriverException as e:
+        logger.error(f"❌ 로그인 중 WebDriver 오류 발생: {e}")
         return False
 def wait_for_page_load(driver, timeout=10):    
     """
@@ -278,73 +196,84 @@ def wait_for_page_load(driver, timeout=10):
         timeout (int): 대기 시간 (초)
     """
     try:
-        WebDriverWait(driver, timeout).until(
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY).until(
             lambda driver: driver.execute_script("return document.readyState") == "complete"
         )
-        time.sleep(2)  # 추가 안정화 시간
     except TimeoutException:
         logger.warning(f"⚠️ 페이지 로딩 타임아웃 ({timeout}초)")
-def navigate_to_handover_document_list(driver, timeout=20):
-    """
-    1. '전자결재' 메뉴 클릭
-    2. '인수인계' 상위 메뉴 확장
-    3. '인수인계문서' 서브 메뉴 클릭을 통해 최종 목적지로 이동합니다.
+
+def save_session(driver, path=SESSION_CACHE_PATH):
     """
+    로그인 후 쿠키를 디스크에 저장합니다.
     
-    # [수정] HTML 선택자 정의 (NameError 방지)
-    XPATH_ELECTRONIC_APPROVAL = "//span[text()='전자결재']" 
-    XPATH_EAP_SIDE_LOADED = "//span[text()='인수인계']" # 로딩 대기용 텍스트
-    ID_TOP_MENU = "UBA_UBA5000"  # '인수인계' 상위 메뉴 ID
-    ID_SUB_MENU = "//span[text()='인수인계문서']"  # '인수인계문서' 하위 메뉴 name
-    
-    # --- 1단계: '전자결재' 메뉴 클릭 (EAP 페이지로 진입) ---
+    Args:
+        driver: 로그인된 Selenium WebDriver 인스턴스
+        path (str): 세션 캐시 파일 경로
+    """
     try:
-        logger.info("1단계: 🔍 '전자결재' 메뉴 클릭 시도 중...")
-        WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable((By.XPATH, XPATH_ELECTRONIC_APPROVAL))
-        ).click()
-        logger.info("✅ '전자결재' 메뉴 클릭 성공. 내부 요소 로딩 대기 중...")
-        
-        # 전자결재 페이지 내부 요소 (결재수신함) 로딩 대기
-        WebDriverWait(driver, timeout).until(
-             EC.presence_of_element_located((By.XPATH, XPATH_EAP_SIDE_LOADED))
-        )
-        logger.info("✅ 전자결재 페이지 내부 요소 로딩 완료 확인.")
-
+        # 인증 쿠키가 평문으로 저장되므로 캐시 디렉터리/파일은 소유자만 접근 가능하게 생성
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "cookies": driver.get_cookies()}, f)
+        os.chmod(path, 0o600)  # 이전 버전이 기본 권한으로 만든 파일도 소유자 전용으로 변경
+        logger.info(f"💾 로그인 세션 저장 완료: {path}")
     except Exception as e:
-        logger.error(f"❌ 1단계: 전자결재 메뉴 이동 실패. 오류: {e}")
+        logger.warning(f"⚠️ 로그인 세션 저장 실패: {e}")
+
+def invalidate_session(path=SESSION_CACHE_PATH):
+    """저장된 세션 캐시를 삭제합니다."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def restore_session(driver, url, path=SESSION_CACHE_PATH, ttl=SESSION_TTL_SECONDS, invalidate_on_failure=True):
+    """
+    저장된 쿠키를 주입하여 로그인 과정을 생략합니다.
+    
+    Args:
+        driver: Selenium WebDriver 인스턴스
+        url (str): 그룹웨어 URL
+        path (str): 세션 캐시 파일 경로
+        ttl (int): 캐시 유효 시간 (초)
+        invalidate_on_failure (bool): 복원 실패 시 캐시 파일 삭제 여부
+            (병렬 작업용 세션은 False로 호출하여 메인 드라이버가 방금 저장한 캐시를 지우지 않음)
+        
+    Returns:
+        bool: 세션 복원 성공 여부 (실패 시 login_groupware로 대체)
+    """
+    if not os.path.exists(path):
         return False
     
-    # --- 2단계: '인수인계' 메뉴 확장 및 '인수인계문서' 클릭 ---
     try:
-        # --- 2단계: '인수인계문서'로 바로 이동 (이미 펼쳐진 상태 가정) ---
-        
-        logger.info("2단계: 🔍 '인수인계문서' 서브 메뉴 클릭 시도 중...")
-        sub_menu_span_locator = (By.ID, ID_SUB_MENU)
-        
-        # 하위 메뉴의 <span> 태그가 나타나고 클릭 가능할 때까지 대기
-        sub_menu_span = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable(sub_menu_span_locator)
-        )
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
         
-        # Span의 부모 DIV를 찾아 최종 클릭하여 페이지 이동
-        sub_menu_div = sub_menu_span.find_element(By.XPATH, "./..")
-        
-        # JavaScript 강제 클릭 실행 (가장 확실하게 클릭)
-        driver.execute_script("arguments[0].click();", sub_menu_div)
+        if time.time() - cached.get("saved_at", 0) > ttl:
+            logger.info("⌛ 저장된 세션이 만료되었습니다. 다시 로그인합니다.")
+            if invalidate_on_failure:
+                invalidate_session(path)
+            return False
         
-        # 최종 페이지 로딩 확인을 위한 잠시 대기
-        time.sleep(3) 
+        # 쿠키는 같은 도메인 페이지에서만 추가 가능하므로 먼저 접속
+        driver.get(url)
+        for cookie in cached.get("cookies", []):
+            driver.add_cookie(cookie)
+        driver.get(url)
         
-        logger.info("🎉 '인수인계문서'함으로 최종 이동 성공 (JS 강제 클릭)")
+        # 로그인 후 메인 화면 요소로 세션 유효성 확인 (main.py의 로그인 확인과 같은 요소)
+        WebDriverWait(driver, 10, poll_frequency=WAIT_POLL_FREQUENCY).until(
+            EC.presence_of_element_located((By.XPATH, MAIN_PAGE_READY_XPATH))
+        )
+        logger.info("✅ 저장된 세션으로 로그인 복원 성공")
         return True
-
+        
     except TimeoutException:
-        logger.error(f"❌ 2단계: '인수인계' 메뉴 확장/클릭 타임아웃. ID: {ID_TOP_MENU} 또는 {ID_SUB_MENU} 확인 필요.")
-        return False
-    except NoSuchElementException:
-        logger.error(f"❌ 2단계: 메뉴 요소의 HTML 구조가 변경되었습니다. ID/XPath 확인 필요.")
-        return False
+        logger.warning("⚠️ 저장된 세션이 유효하지 않습니다. 다시 로그인합니다.")
     except Exception as e:
-        logger.error(f"❌ 2단계: 예상치 못한 오류 발생: {e}", exc_info=True)
-        return False
\ No newline at end of file
+        logger.warning(f"⚠️ 세션 복원 실패: {e}")
+    
+    if invalidate_on_failure:
+        invalidate_session(path)
+    return False